@@ -0,0 +1,149 @@
+# assets.py
+# 비트맵 자산 로더: BMP/.bin 을 패널 바이트 순서 RGB565 스프라이트로 한 번만 디코드하고
+# 바이트 예산이 있는 RAM 캐시에 보관합니다. 이후 그리기는 framebuf.blit 한 번.
+import os
+import struct
+import framebuf
+
+CACHE_BYTES = 16 * 1024   # 스프라이트 캐시 예산 (바이트)
+BIN_MAGIC   = b"SP"        # tools/bmp2bin.py 가 만드는 .bin 헤더
+BIN_HEADER  = "<2sHHi"     # magic, width, height, key(-1 = 투명색 없음)
+
+
+def _panel565(r, g, b):
+    """RGB888 -> 패널 바이트 순서(스왑된) RGB565"""
+    return (((g & 0x1C) << 11) | ((b & 0xF8) << 5)) | ((r & 0xF8) | (g >> 5))
+
+
+class LRUCache:
+    """바이트 예산이 있는 작은 LRU 캐시 (dict + 사용 순서 리스트)"""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self._items = {}   # key -> (value, nbytes)
+        self._order = []   # 오래된 것 -> 최근 것
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            return None
+        if self._order[-1] != key:
+            self._order.remove(key)
+            self._order.append(key)
+        return item[0]
+
+    def put(self, key, value, nbytes):
+        if key in self._items:
+            self.used -= self._items[key][1]
+            self._order.remove(key)
+        # 예산을 넘으면 오래된 것부터 버림 (하나 남은 큰 항목은 유지)
+        while self._order and self.used + nbytes > self.max_bytes:
+            old = self._order.pop(0)
+            self.used -= self._items.pop(old)[1]
+        self._items[key] = (value, nbytes)
+        self._order.append(key)
+        self.used += nbytes
+        return value
+
+    def clear(self):
+        self._items = {}
+        self._order = []
+        self.used = 0
+
+
+class Sprite:
+    """패널 바이트 순서 RGB565 픽셀 + 투명 키 (blit의 key 인자로 그대로 사용)"""
+    __slots__ = ("w", "h", "key", "buf", "fb")
+
+    def __init__(self, w, h, key, buf):
+        self.w = w
+        self.h = h
+        self.key = key
+        self.buf = buf
+        self.fb = framebuf.FrameBuffer(buf, w, h, framebuf.RGB565)
+
+
+def decode_bmp24(path, colkey=None):
+    """24비트 무압축 BMP를 Sprite로 디코드 (colkey=(r,g,b) 픽셀은 투명)"""
+    with open(path, "rb") as f:
+        hdr = f.read(54)
+        if hdr[0:2] != b"BM":
+            raise ValueError("Not a BMP")
+        pixel_offset = struct.unpack("<I", hdr[10:14])[0]
+        dib, width, height, planes, bpp, comp = struct.unpack("<IiiHHI", hdr[14:34])
+        if dib < 40:
+            raise ValueError("Unsupported DIB header")
+        if bpp != 24 or comp != 0:
+            raise ValueError("Need 24-bit uncompressed BMP")
+
+        top_down = False
+        if height < 0:
+            height = -height
+            top_down = True
+
+        # 투명 키: colkey의 565 값. 불투명 픽셀이 우연히 같은 값이면 파랑 LSB를 바꿔 구분
+        key = -1 if colkey is None else _panel565(*colkey)
+        alt = key ^ 0x0100
+
+        buf = bytearray(width * height * 2)
+        row_bytes = ((width * 3 + 3) // 4) * 4
+        f.seek(pixel_offset)
+        for row in range(height):
+            line = f.read(row_bytes)
+            dst_y = row if top_down else (height - 1 - row)
+            o = dst_y * width * 2
+            idx = 0
+            for _ in range(width):
+                b = line[idx]; g = line[idx+1]; r = line[idx+2]
+                if key >= 0 and (r, g, b) == colkey:
+                    c = key
+                else:
+                    c = _panel565(r, g, b)
+                    if c == key:
+                        c = alt
+                # framebuf RGB565 는 리틀엔디안 저장
+                buf[o] = c & 0xFF
+                buf[o+1] = c >> 8
+                o += 2
+                idx += 3
+    return Sprite(width, height, key, buf)
+
+
+def load_bin(path):
+    """tools/bmp2bin.py 로 만든 .bin 을 그대로 읽어 Sprite 생성 (파싱/변환 없음)"""
+    with open(path, "rb") as f:
+        magic, w, h, key = struct.unpack(BIN_HEADER, f.read(struct.calcsize(BIN_HEADER)))
+        if magic != BIN_MAGIC:
+            raise ValueError("Not a sprite .bin")
+        buf = bytearray(w * h * 2)
+        f.readinto(buf)
+    return Sprite(w, h, key, buf)
+
+
+def bin_key(path):
+    """.bin 헤더의 투명 키 (-1 = 없음). 파일이 없거나 .bin 이 아니면 None"""
+    try:
+        with open(path, "rb") as f:
+            magic, _, _, key = struct.unpack(BIN_HEADER, f.read(struct.calcsize(BIN_HEADER)))
+    except (OSError, ValueError):
+        return None
+    return key if magic == BIN_MAGIC else None
+
+
+_cache = LRUCache(CACHE_BYTES)
+
+
+def get_sprite(path, colkey=None):
+    """캐시된 Sprite 반환. 'x.bmp' 요청 시 같은 이름의 'x.bin'이 있고 투명 키가 colkey 와 같으면
+    그것을 사용, 다르면 BMP 를 디코드. '.bin' 을 직접 요청하면 colkey 는 무시(파일에 구운 키 사용)"""
+    ck = (path, colkey)
+    sp = _cache.get(ck)
+    if sp is not None:
+        return sp
+    if path.endswith(".bin"):
+        sp = load_bin(path)
+    else:
+        bin_path = path[:-4] + ".bin"
+        key = -1 if colkey is None else _panel565(*colkey)
+        sp = load_bin(bin_path) if bin_key(bin_path) == key else decode_bmp24(path, colkey)
+    return _cache.put(ck, sp, len(sp.buf))
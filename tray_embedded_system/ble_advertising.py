@@ -27,7 +27,7 @@ def advertising_payload(limited_disc=False, br_edr=False, name=None, services=No
     )
 
     if name:
-        _append(_ADV_TYPE_NAME, name)
+        _append(_ADV_TYPE_NAME, name.encode() if isinstance(name, str) else name)
 
     if services:
         for uuid in services:
@@ -69,17 +69,3 @@ def decode_services(payload):
     for u in decode_field(payload, _ADV_TYPE_UUID128_COMPLETE):
         services.append(bluetooth.UUID(u))
     return services
-
-
-def demo():
-    payload = advertising_payload(
-        name="micropython",
-        services=[bluetooth.UUID(0x181A), bluetooth.UUID("6E400001-B5A3-F393-E0A9-E50E24DCCA9E")],
-    )
-    print(payload)
-    print(decode_name(payload))
-    print(decode_services(payload))
-
-
-if __name__ == "__main__":
-    demo()
@@ -3,94 +3,363 @@ import time
 import micropython
 from micropython import const
 import uasyncio as asyncio
+from array import array
 from ble_advertising import advertising_payload
+import tracing
 
 _IRQ_CENTRAL_CONNECT    = const(1)
 _IRQ_CENTRAL_DISCONNECT = const(2)
 _IRQ_GATTS_WRITE        = const(3)
+_IRQ_MTU_EXCHANGED      = const(21)
+_IRQ_CONNECTION_UPDATE  = const(27)
 
 # QR코드 값 수신을 위한 UUID 정의
 _QR_SERVICE_UUID = bluetooth.UUID("12345678-1234-5678-1234-56789abcdef0")
 _QR_RX_UUID      = bluetooth.UUID("12345678-1234-5678-1234-56789abcdef1")
+_QR_BULK_UUID    = bluetooth.UUID("12345678-1234-5678-1234-56789abcdef2")
+_QR_ACK_UUID     = bluetooth.UUID("12345678-1234-5678-1234-56789abcdef3")
+_QR_STATS_UUID   = bluetooth.UUID("12345678-1234-5678-1234-56789abcdef4")
 
 _QR_SERVICE = (
     _QR_SERVICE_UUID,
     (
         (_QR_RX_UUID, bluetooth.FLAG_WRITE,),  # 앱에서 Write 가능
+        # 묶음 전송: [len(1) | payload(len)] 레코드를 이어 붙여 응답 없이 Write
+        (_QR_BULK_UUID, bluetooth.FLAG_WRITE | bluetooth.FLAG_WRITE_NO_RESPONSE,),
+        # 누적 수신 레코드 수(uint16 LE)를 Notify -> 보내는 쪽 흐름 제어용
+        (_QR_ACK_UUID, bluetooth.FLAG_READ | bluetooth.FLAG_NOTIFY,),
+        # 단계별 지연 요약 (tracing.summary() 바이너리) Read/Notify
+        (_QR_STATS_UUID, bluetooth.FLAG_READ | bluetooth.FLAG_NOTIFY,),
     ),
 )
 
+SLOT_SIZE = 128   # 메시지 하나의 최대 바이트 (넘는 메시지는 받지 않고 frame_errors 로 셈, ACK 안 함)
+BULK_BUF  = 512   # 묶음 characteristic 의 스택 버퍼 (gatts_set_buffer)
+MAX_CONN  = 3     # 동시에 받을 central 수 (각자 inbox 를 가짐)
+MTU       = 247   # 연결 시 교환 요청할 ATT MTU (한 Write 에 레코드 여러 개)
+
+
+@micropython.viper
+def _copy_into(dst: ptr8, off: int, src: ptr8, soff: int, n: int):
+    # IRQ 안에서 힙 할당 없이 바이트 복사 (앞쪽으로 겹치는 이동도 안전)
+    for i in range(n):
+        dst[off + i] = src[soff + i]
+
+
+class SlotRing:
+    """고정 크기 슬롯 링 버퍼. put()은 IRQ에서 할당 없이 복사만 하고
+    디코드는 꺼내는 쪽에서 함. 가득 차면 가장 오래된 슬롯을 덮어씀.
+    head 는 put()(IRQ)만, tail 은 take()(소비자)만 바꿈 -> 서로 끼어들어도 카운터가 꼬이지 않음.
+    덮어쓴 슬롯은 take() 가 head 를 보고 알아채서 건너뛰고 drops 로 셈"""
+    def __init__(self, n, size=SLOT_SIZE):
+        self.n = n
+        self.size = size
+        self.buf = bytearray(n * size)
+        self.mv = memoryview(self.buf)
+        self.lens = array("H", [0] * n)
+        self.ts = array("L", [0] * n)   # 슬롯별 IRQ 시각 (ticks_us)
+        # 쓴/읽은 메시지 수 (mod wrap). wrap 을 n 의 배수로 두어 슬롯 = 카운터 % n
+        self.wrap = n * 0x4000
+        self.head = 0
+        self.tail = 0
+        # 통계
+        self.drops = 0
+        self.high_water = 0
+
+    def __len__(self):
+        k = (self.head - self.tail) % self.wrap
+        return k if k < self.n else self.n
+
+    def put(self, data, t, off=0, n=-1):
+        """data[off:off+n] 을 슬롯 하나에 복사 (n<0 이면 끝까지). 슬롯보다 크면 넣지 않고 False"""
+        k = len(data) - off if n < 0 else n
+        if k > self.size:
+            return False
+        h = self.head
+        i = h % self.n
+        _copy_into(self.buf, i * self.size, data, off, k)
+        self.lens[i] = k
+        self.ts[i] = t
+        self.head = (h + 1) % self.wrap
+        q = (self.head - self.tail) % self.wrap
+        if q > self.high_water:
+            self.high_water = q if q < self.n else self.n
+        return True
+
+    def take(self):
+        """가장 오래된 슬롯 -> (bytes, IRQ 시각). 비어 있으면 None"""
+        while True:
+            t = self.tail
+            q = (self.head - t) % self.wrap
+            if not q:
+                return None
+            if q > self.n:
+                # 소비자가 늦어 덮어쓴 만큼 건너뜀
+                self.drops += q - self.n
+                t = (self.head - self.n) % self.wrap
+            i = t % self.n
+            o = i * self.size
+            item = (bytes(self.mv[o:o + self.lens[i]]), self.ts[i])
+            self.tail = (t + 1) % self.wrap
+            # 복사하는 동안 IRQ 가 이 슬롯을 덮어썼으면 버리고 다시
+            if (self.head - t) % self.wrap <= self.n:
+                return item
+            self.drops += 1
+
+
+class _Conn:
+    """central 하나의 수신 상태: 전용 inbox, 재조립 버퍼, 누적 ACK, 처리량 통계"""
+    def __init__(self, inbox_max):
+        self.inbox = SlotRing(inbox_max)
+        self.asm = bytearray(BULK_BUF + 256)
+        self.ack_buf = bytearray(2)
+        self.frame_errors = 0
+        self.reset(-1)
+
+    def reset(self, handle):
+        self.handle = handle      # -1 = 빈 자리
+        self.asm_n = 0
+        self.rx_seq = 0           # 받은 레코드 누적 수 (uint16 순환)
+        self.ack_pending = False
+        self.mtu = 23
+        self.interval = 0         # 1.25ms 단위 (연결 업데이트 IRQ 값)
+        self.latency = 0
+        self.timeout = 0
+        self.rx_bytes = 0
+        self.rx_records = 0
+        self.t_connect = time.ticks_ms()
+
+    def stats(self):
+        ms = time.ticks_diff(time.ticks_ms(), self.t_connect)
+        return {
+            "conn": self.handle,
+            "mtu": self.mtu,
+            "interval_us": self.interval * 1250,
+            "rx_bytes": self.rx_bytes,
+            "rx_records": self.rx_records,
+            "rx_Bps": self.rx_bytes * 1000 // ms if ms > 0 else 0,
+            "rx_seq": self.rx_seq,
+            "drops": self.inbox.drops,
+            "high_water": self.inbox.high_water,
+            "queued": len(self.inbox),
+            "frame_errors": self.frame_errors,
+        }
+
+
 class BLEQRReceiver:
-    def __init__(self, name="PICO_QR", inbox_max=16):
+    def __init__(self, name="PICO_QR", inbox_max=16, max_conn=MAX_CONN, mtu=MTU):
         self._ble = bluetooth.BLE()
         self._ble.active(True)
+        try:
+            self._ble.config(mtu=mtu)   # 교환 시 제안할 MTU
+        except:
+            pass
         self._ble.irq(self._irq)
 
-        ((self._rx_handle,),) = self._ble.gatts_register_services((_QR_SERVICE,))
+        ((self._rx_handle, self._bulk_handle, self._ack_handle, self._stats_handle),) = \
+            self._ble.gatts_register_services((_QR_SERVICE,))
         try:
             self._ble.gatts_set_buffer(self._rx_handle, 512, True)
+            self._ble.gatts_set_buffer(self._bulk_handle, BULK_BUF, True)
         except:
             pass
-        
-        self._payload = advertising_payload(name=name, services=[_QR_SERVICE_UUID])
-        self._advertise()
 
-        # Queue 대체: 내부 버퍼 + 신호 플래그
-        self._inbox = []
-        self._inbox_max = inbox_max
+        # 연결별 상태는 미리 만들어 두고 connect IRQ 에서 자리만 배정
+        self._conns = [_Conn(inbox_max) for _ in range(max_conn)]
+        self._rr = 0              # 라운드로빈 시작 위치
         # 일부 빌드엔 Event가 없을 수 있으니 ThreadSafeFlag 사용
         self._flag = asyncio.ThreadSafeFlag()
         self._scheduled = False
+        # IRQ -> 소비자 지연 (us)
+        self.last_latency_us = 0
+        self.max_latency_us = 0
+        self._lat_sum_us = 0
+        self._lat_n = 0
+        self.last_t_irq = 0
+
+        self._payload = advertising_payload(name=name, services=[_QR_SERVICE_UUID])
+        self._advertise()
+
+    def _find(self, handle):
+        for c in self._conns:
+            if c.handle == handle:
+                return c
+        return None
 
     def _irq(self, event, data):
         if event == _IRQ_GATTS_WRITE:
             conn_handle, value_handle = data
+            c = self._find(conn_handle)
+            if c is None:
+                return
             if value_handle == self._rx_handle:
-                msg = self._ble.gatts_read(self._rx_handle).decode("utf-8", "ignore")
-                # IRQ에서는 짧게: 버퍼 넣고 schedule만
-                if len(self._inbox) >= self._inbox_max:
-                    self._inbox.pop(0)  # 오래된 것 드롭
-                self._inbox.append(msg)
-                if not self._scheduled:
-                    self._scheduled = True
-                    micropython.schedule(self._signal, 0)
+                # IRQ에서는 짧게: 슬롯에 복사(디코드 없음)하고 schedule만
+                buf = self._ble.gatts_read(self._rx_handle)
+                c.rx_bytes += len(buf)
+                if not c.inbox.put(buf, time.ticks_us()):
+                    c.frame_errors += 1   # 잘린 메시지를 전달하지 않음
+                    return
+                c.rx_records += 1
+                self._wake()
+            elif value_handle == self._bulk_handle:
+                self._ingest(c, self._ble.gatts_read(self._bulk_handle), time.ticks_us())
+                c.ack_pending = True
+                self._wake()
+
+        elif event == _IRQ_CENTRAL_CONNECT:
+            c = self._find(-1)
+            if c is None:
+                self._ble.gap_disconnect(data[0])   # 자리가 없으면 거절
+                return
+            # 새 연결마다 순번/재조립 상태를 초기화 (남은 inbox 는 그대로 소비)
+            c.reset(data[0])
+            try:
+                self._ble.gattc_exchange_mtu(data[0])
+            except:
+                pass
+            if self._find(-1) is not None:
+                self._advertise()   # 다른 central 도 붙을 수 있게 계속 광고
 
         elif event == _IRQ_CENTRAL_DISCONNECT:
+            c = self._find(data[0])
+            if c is not None:
+                c.handle = -1
             self._advertise()
 
+        elif event == _IRQ_MTU_EXCHANGED:
+            c = self._find(data[0])
+            if c is not None:
+                c.mtu = data[1]
+
+        elif event == _IRQ_CONNECTION_UPDATE:
+            # (conn, interval, latency, supervision_timeout, status)
+            c = self._find(data[0])
+            if c is not None and data[4] == 0:
+                c.interval = data[1]
+                c.latency = data[2]
+                c.timeout = data[3]
+
+    def _wake(self):
+        if not self._scheduled:
+            self._scheduled = True
+            micropython.schedule(self._signal, 0)
+
+    def _ingest(self, c, data, t):
+        """묶음 Write 조각을 연결별 재조립 버퍼에 붙이고 완성된 레코드를 inbox 에 넣음 (IRQ, 할당 없음)"""
+        asm = c.asm
+        n = c.asm_n
+        k = len(data)
+        c.rx_bytes += k
+        if n + k > len(asm):
+            # 버퍼를 넘는 건 프레이밍이 깨진 것: 버리고 다시 맞춤
+            c.frame_errors += 1
+            n = 0
+            if k > len(asm):
+                k = len(asm)
+        _copy_into(asm, n, data, 0, k)
+        n += k
+        i = 0
+        while i < n:
+            ln = asm[i]
+            if i + 1 + ln > n:
+                break                     # 다음 Write 에서 이어짐
+            if ln:
+                if c.inbox.put(asm, t, i + 1, ln):
+                    c.rx_seq = (c.rx_seq + 1) & 0xFFFF
+                    c.rx_records += 1
+                else:
+                    c.frame_errors += 1   # 슬롯보다 긴 레코드: 버리고 ACK 순번도 올리지 않음
+            i += 1 + ln
+        if i:
+            _copy_into(asm, 0, asm, i, n - i)
+        c.asm_n = n - i
+
     def _signal(self, _):
         self._scheduled = False
+        for c in self._conns:
+            if c.ack_pending:
+                c.ack_pending = False
+                self._send_ack(c)
         # 대기 중 태스크 깨우기 (latched, 다음 wait에도 잘 동작)
         try:
             self._flag.set()
         except Exception as e:
             print("flag set error:", e)
 
+    def _send_ack(self, c):
+        # 여러 Write 를 한 번의 Notify 로 몰아서 그 연결의 누적 순번을 알림
+        if c.handle < 0:
+            return
+        seq = c.rx_seq
+        c.ack_buf[0] = seq & 0xFF
+        c.ack_buf[1] = seq >> 8
+        # Notify 는 저장된 값을 바꾸지 않음 -> 재연결 후 Read 로 맞출 수 있게 값도 갱신
+        # (값은 연결 공용이라 마지막으로 알린 연결의 순번)
+        self._ble.gatts_write(self._ack_handle, c.ack_buf)
+        try:
+            self._ble.gatts_notify(c.handle, self._ack_handle, c.ack_buf)
+        except OSError:
+            pass
+
+    def publish_stats(self, data, notify=True):
+        """stats characteristic 값을 갱신하고 연결된 central 에 Notify (tracing.run 의 sink).
+        Notify 한 번에 안 들어가는 연결(MTU 교환 전, 20 B)에는 tracing.summary_short() 를 보냄
+        -> 전체 값은 Read(long read)로 읽을 수 있음"""
+        self._ble.gatts_write(self._stats_handle, data)
+        if notify:
+            short = None
+            for c in self._conns:
+                if c.handle < 0:
+                    continue
+                try:
+                    if len(data) <= c.mtu - 3:
+                        self._ble.gatts_notify(c.handle, self._stats_handle)   # 저장된 값 그대로
+                    else:
+                        if short is None:
+                            short = tracing.summary_short()
+                        self._ble.gatts_notify(c.handle, self._stats_handle, short)
+                except OSError:
+                    pass
+
     def _advertise(self, interval_us=500_000):
         self._ble.gap_advertise(interval_us, adv_data=self._payload)
 
-    async def get_msg(self):
-        """메시지 하나를 비동기로 가져옵니다."""
+    def _take(self):
+        # 연결들을 라운드로빈으로 돌며 하나씩: 느린/폭주하는 한 폰이 다른 폰을 막지 않게
+        n = len(self._conns)
+        for k in range(n):
+            c = self._conns[(self._rr + k) % n]
+            item = c.inbox.take()
+            if item is not None:
+                self._rr = (self._rr + k + 1) % n
+                return item
+        return None
+
+    async def get_bytes(self):
+        """메시지 하나를 디코드 없이 bytes로 비동기로 가져옵니다."""
         while True:
-            if self._inbox:
-                return self._inbox.pop(0)
+            item = self._take()
+            if item is not None:
+                lat = time.ticks_diff(time.ticks_us(), item[1])
+                tracing.add(tracing.ST_BLE, lat)
+                self.last_t_irq = item[1]   # 도착 시각 (끝단 지연 추적용)
+                self.last_latency_us = lat
+                if lat > self.max_latency_us:
+                    self.max_latency_us = lat
+                self._lat_sum_us += lat
+                self._lat_n += 1
+                return item[0]
             await self._flag.wait()   # 신호 대기
 
+    async def get_msg(self):
+        """메시지 하나를 비동기로 가져옵니다. (UTF-8 디코드는 IRQ가 아닌 여기서)"""
+        return (await self.get_bytes()).decode("utf-8", "ignore")
 
-async def consumer(receiver: BLEQRReceiver):
-    while True:
-        msg = await receiver.get_msg()
-        print("QR:", msg)
-
-async def main():
-    r = BLEQRReceiver()
-    asyncio.create_task(consumer(r))
-    while True:
-        await asyncio.sleep(1)
-
-if __name__ == "__main__":
-    asyncio.run(main())
-    
-
-
-
+    def stats(self):
+        """수신 통계: IRQ->소비자 지연(us) + 연결별 처리량/드롭/최고 적재량"""
+        return {
+            "last_latency_us": self.last_latency_us,
+            "max_latency_us": self.max_latency_us,
+            "avg_latency_us": self._lat_sum_us // self._lat_n if self._lat_n else 0,
+            "conns": [c.stats() for c in self._conns if c.handle >= 0],
+        }
@@ -1,9 +1,18 @@
-# st7735_test.py
-# Raspberry Pi Pico(W) + ST7735 SPI TFT Test (Multi-display with demux or multiple CS pins)
+# display.py
+# Raspberry Pi Pico(W) + ST7735 SPI TFT (Multi-display with demux or multiple CS pins)
 # MicroPython code with minimal ST7735 driver
 
-from machine import Pin, SPI, PWM
+from machine import Pin
 import time, framebuf
+import uasyncio as asyncio
+import assets
+
+try:
+    import rp2                  # RP2040 DMA (MicroPython 1.21+)
+    from machine import mem32
+    _HAS_DMA = hasattr(rp2, "DMA")
+except ImportError:
+    _HAS_DMA = False
 
 # =======================
 # Pin Configuration (GPIO numbers)
@@ -24,6 +33,25 @@ SPI_BAUD  = 20_000_000  # 20~40 MHz (안정성 고려)
 ROTATION  = 0           # 0~3 선택
 COLOR_ORDER_BGR = False # 색 순서 반전 시 True
 
+# Dirty 영역 병합 설정
+DIRTY_MAX        = 8    # 보관할 dirty 사각형 최대 개수 (넘으면 하나로 합침)
+DIRTY_MERGE_SLACK = 256 # 합쳤을 때 늘어나는 픽셀 수가 이 이하면 병합 (창 설정 오버헤드 고려)
+
+# 밴드(strip) 렌더링: 패널별 전체 프레임버퍼 대신 공유 strip 하나에 밴드 단위로 그려 전송
+STRIP_ROWS = 16
+
+# 비동기 전송(show_async) 설정
+FLUSH_CHUNK = 2048      # DMA가 없을 때 한 번에 쓰는 바이트. 최대 루프 정지 ≈ chunk*8/SPI_BAUD (2048B@20MHz ≈ 0.8ms)
+USE_DMA     = True      # rp2.DMA 가 있으면 사용
+
+# RP2040 PL022 SPI 레지스터 (DMA 전송용)
+_SPI_BASE     = (0x4003C000, 0x40040000)  # SPI0, SPI1
+_SSPDR        = const(0x008)
+_SSPSR        = const(0x00C)
+_SSPICR       = const(0x020)
+_SSPDMACR     = const(0x024)
+_DREQ_SPI_TX  = (16, 18)                  # DREQ_SPI0_TX, DREQ_SPI1_TX
+
 # ====== Color helper ======
 def rgb565(r, g, b):
     return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
@@ -37,33 +65,309 @@ YELLOW  = rgb565(255,255,0)
 CYAN    = rgb565(0,255,255)
 MAGENTA = rgb565(255,0,255)
 
+def _swap16(c):
+    """논리 RGB565 값을 패널(빅엔디안) 바이트 순서로 변환.
+    framebuf는 16비트 픽셀을 리틀엔디안으로 저장하므로, 미리 스왑된 값을 그리면
+    버퍼가 곧바로 ST7735가 기대하는 바이트 순서가 되어 show()에서 스왑이 필요 없음."""
+    return ((c & 0xFF) << 8) | ((c >> 8) & 0xFF)
+
+# ====== 확대 글리프 캐시 ======
+GLYPH_CACHE_BYTES = 12 * 1024  # (문자, 배율, 색)별 확대 글리프 캐시 예산
+
+# 8x8 원본 글리프를 그려 읽어 올 작업 버퍼 (모든 패널 공용)
+_gbuf = bytearray(8 * 8 * 2)
+_gfb  = framebuf.FrameBuffer(_gbuf, 8, 8, framebuf.RGB565)
+_glyphs = assets.LRUCache(GLYPH_CACHE_BYTES)
+
+def _scaled_glyph(ch, scale, col):
+    """확대 글리프 Sprite 반환 (col은 패널 바이트 순서 값).
+    미스일 때만 래스터화: 가로로 이어진 픽셀은 fill_rect 하나로 합쳐 그림"""
+    k = (ch, scale, col)
+    g = _glyphs.get(k)
+    if g is not None:
+        return g
+    size = 8 * scale
+    key = col ^ 0xFFFF  # 글자색과 절대 겹치지 않는 투명 키
+    g = assets.Sprite(size, size, key, bytearray(size * size * 2))
+    g.fb.fill(key)
+    _gfb.fill(0x0000)
+    _gfb.text(ch, 0, 0, 0xFFFF)
+    for yy in range(8):
+        xx = 0
+        while xx < 8:
+            if _gfb.pixel(xx, yy) != 0xFFFF:
+                xx += 1
+                continue
+            x0 = xx
+            while xx < 8 and _gfb.pixel(xx, yy) == 0xFFFF:
+                xx += 1
+            g.fb.fill_rect(x0 * scale, yy * scale, (xx - x0) * scale, scale, col)
+    return _glyphs.put(k, g, len(g.buf))
+
+def _blit_text_scaled(fb, s, x, y, col, scale, bg=None, spacing=0):
+    """확대 글자열을 fb에 그림 (col/bg는 패널 바이트 순서 값). 끝난 x 좌표 반환"""
+    adv = (8 + spacing) * scale
+    for ch in s:
+        if bg is not None:
+            fb.fill_rect(x, y, 8*scale, 8*scale, bg)
+        g = _scaled_glyph(ch, scale, col)
+        fb.blit(g.fb, x, y, g.key)
+        x += adv
+    return x
+
+# ====== 그리기 목록(draw list) ======
+# 카드 하나를 짧은 op 튜플 목록으로 기술 -> 프레임버퍼에도, 밴드 strip에도 같은 방식으로 그림
+OP_FILL        = const(0)  # (OP_FILL, col)
+OP_FILL_RECT   = const(1)  # (OP_FILL_RECT, x, y, w, h, col)
+OP_TEXT        = const(2)  # (OP_TEXT, s, x, y, col)
+OP_TEXT_SCALED = const(3)  # (OP_TEXT_SCALED, s, x, y, col, scale)
+OP_BMP         = const(4)  # (OP_BMP, path, x, y, colkey)
+OP_LAYER       = const(5)  # (OP_LAYER, StaticLayer) - 미리 그린 정적 레이어 복원 (전체 화면)
+
+def op_bounds(op):
+    """op가 덮는 (x, y, w, h). OP_FILL은 None(전체 화면)"""
+    k = op[0]
+    if k == OP_FILL_RECT:
+        return op[1], op[2], op[3], op[4]
+    if k == OP_TEXT:
+        return op[2], op[3], 8 * len(op[1]), 8
+    if k == OP_TEXT_SCALED:
+        return op[2], op[3], 8 * op[5] * len(op[1]), 8 * op[5]
+    if k == OP_BMP:
+        sp = assets.get_sprite(op[1], op[4])
+        return op[2], op[3], sp.w, sp.h
+    return None
+
+def draw_ops(fb, ops, dy=0, h=None, dx=0):
+    """ops를 fb에 그림. fb의 (0,0) = 화면의 (dx,dy). h가 있으면 [dy, dy+h) 밖의 op는 건너뜀"""
+    for op in ops:
+        k = op[0]
+        if k == OP_FILL:
+            fb.fill(_swap16(op[1]))
+            continue
+        if k == OP_LAYER:
+            op[1].restore(fb, dy)
+            continue
+        if h is not None:
+            b = op_bounds(op)
+            if b[1] >= dy + h or b[1] + b[3] <= dy:
+                continue
+        if k == OP_FILL_RECT:
+            fb.fill_rect(op[1] - dx, op[2] - dy, op[3], op[4], _swap16(op[5]))
+        elif k == OP_TEXT:
+            fb.text(op[1], op[2] - dx, op[3] - dy, _swap16(op[4]))
+        elif k == OP_TEXT_SCALED:
+            _blit_text_scaled(fb, op[1], op[2] - dx, op[3] - dy, _swap16(op[4]), op[5])
+        elif k == OP_BMP:
+            sp = assets.get_sprite(op[1], op[4])
+            fb.blit(sp.fb, op[2] - dx, op[3] - dy, sp.key)
+
+class StaticLayer:
+    """배경색 + 정적 op(로고 등)를 한 번만 합성해 둔 카드 템플릿 레이어.
+    전체 화면(40KB)을 저장하지 않고, 배경색과 정적 op들의 외곽 사각형 패치만 보관
+    (로고 50x26 -> 2.6KB). 복원은 fill + 키 없는 blit 두 번의 네이티브 호출."""
+    def __init__(self, bg, ops):
+        self.bg = bg
+        self._bg = _swap16(bg)
+        x0 = y0 = 1 << 15
+        x1 = y1 = -(1 << 15)
+        for op in ops:
+            bx, by, bw, bh = op_bounds(op)
+            x0 = min(x0, bx); y0 = min(y0, by)
+            x1 = max(x1, bx + bw); y1 = max(y1, by + bh)
+        self.x, self.y = x0, y0
+        self.w, self.h = max(x1 - x0, 0), max(y1 - y0, 0)
+        self.patch = None
+        if self.w and self.h:
+            # 배경 위에 미리 합성 -> 복원 시 투명 키 비교가 필요 없음
+            self.patch = assets.Sprite(self.w, self.h, -1, bytearray(self.w * self.h * 2))
+            self.patch.fb.fill(self._bg)
+            draw_ops(self.patch.fb, ops, y0, None, x0)
+
+    def restore(self, fb, dy=0):
+        """레이어 전체 복원 (fb의 0행 = 화면의 dy행)"""
+        fb.fill(self._bg)
+        if self.patch is not None:
+            fb.blit(self.patch.fb, self.x, self.y - dy)
+
+    def restore_rect(self, fb, x, y, w, h):
+        """레이어의 일부 영역만 복원 (동적 필드 지우기)"""
+        fb.fill_rect(x, y, w, h, self._bg)
+        p = self.patch
+        if p is not None and x < self.x + self.w and self.x < x + w and y < self.y + self.h and self.y < y + h:
+            fb.blit(p.fb, self.x, self.y)
+
+class Strip:
+    """모든 패널이 공유하는 밴드 버퍼 (width x rows). 패널 수와 무관하게 메모리 고정"""
+    def __init__(self, width, rows=STRIP_ROWS):
+        self.width = width
+        self.rows = rows
+        self.buffer = bytearray(width * rows * 2)
+        self.mv = memoryview(self.buffer)
+        self.fb = framebuf.FrameBuffer(self.buffer, width, rows, framebuf.RGB565)
+
+# ====== 공유 SPI 버스 중재자 ======
+class SPIBus:
+    """여러 패널이 공유하는 SPI/DC/디먹스(74HC138) 중재자.
+    현재 선택된 디먹스 주소를 기억해 바뀔 때만 핀을 토글하고,
+    명령+파라미터 시퀀스는 미리 할당한 버퍼(seq)에 인코딩해 한 번에 보냅니다."""
+    SEQ_SIZE = 32
+
+    def __init__(self, spi, dc, demux=PIN_CS, spi_id=0):
+        self.spi = spi
+        self.spi_id = spi_id
+        self.dc  = Pin(dc, Pin.OUT, value=0)
+        # 디먹스 입력핀(7,8,9)은 '항상' 준비해둠. demux[i] = 주소 비트 i
+        self._demux = [Pin(p, Pin.OUT, value=0) for p in demux]
+        self._selected = -1  # 아직 아무 패널도 선택 안 됨
+
+        # 시퀀스 포맷: [cmd, nparam, p0 .. p(n-1)] 반복
+        self.seq = bytearray(self.SEQ_SIZE)
+        self._seqmv = memoryview(self.seq)
+        self._cbuf = bytearray(1)
+
+        # 비동기 전송: 한 번에 한 태스크만 버스 사용
+        self.lock = asyncio.Lock()
+        self.chunk = FLUSH_CHUNK
+        self._dma = None
+        if USE_DMA and _HAS_DMA:
+            try:
+                self._dma = rp2.DMA()
+            except Exception:
+                self._dma = None
+        # 측정: await 사이에 이벤트 루프를 막은 최대 시간(us)
+        self.max_stall_us = 0
+
+    def select(self, addr):
+        """디먹스 주소 선택. 이미 선택된 주소면 아무것도 하지 않음"""
+        if addr == self._selected:
+            return
+        # 주의: 항상 모든 입력을 명시적으로 0/1로 설정 (부동 방지)
+        for i, pin in enumerate(self._demux):
+            pin((addr >> i) & 1)
+        # (필요 시 74HC138의 Enable 핀: G1=HIGH, /G2A=/G2B=LOW로 고정 연결)
+        time.sleep_us(3)
+        self._selected = addr
+
+    def cmd(self, addr, c, params=None):
+        """단일 명령 + (선택) 파라미터 바이트열"""
+        self.select(addr)
+        self._cbuf[0] = c
+        self.dc(0)
+        self.spi.write(self._cbuf)
+        if params:
+            self.dc(1)
+            self.spi.write(params)
+
+    def send_seq(self, addr, n):
+        """seq[0:n]에 인코딩된 명령 시퀀스를 전송 (선택은 한 번만)"""
+        self.select(addr)
+        mv = self._seqmv
+        spi = self.spi
+        dc = self.dc
+        i = 0
+        while i < n:
+            dc(0)
+            spi.write(mv[i:i + 1])
+            k = mv[i + 1]
+            i += 2
+            if k:
+                dc(1)
+                spi.write(mv[i:i + k])
+                i += k
+
+    def write_data(self, addr, buf):
+        """픽셀 등 데이터 바이트 전송 (DC=1)"""
+        self.select(addr)
+        self.dc(1)
+        self.spi.write(buf)
+
+    def _stall(self, t0):
+        dt = time.ticks_diff(time.ticks_us(), t0)
+        if dt > self.max_stall_us:
+            self.max_stall_us = dt
+
+    async def write_data_async(self, addr, buf):
+        """데이터 전송 중 이벤트 루프에 양보. DMA가 있으면 DMA, 없으면 chunk 단위로 나눠 씀"""
+        t0 = time.ticks_us()
+        self.select(addr)
+        self.dc(1)
+        if self._dma is not None:
+            await self._dma_write(buf, t0)
+            return
+        mv = memoryview(buf)
+        n = len(mv)
+        i = 0
+        while i < n:
+            self.spi.write(mv[i:i + self.chunk])
+            i += self.chunk
+            self._stall(t0)
+            await asyncio.sleep_ms(0)
+            t0 = time.ticks_us()
+
+    async def _dma_write(self, buf, t0):
+        base = _SPI_BASE[self.spi_id]
+        d = self._dma
+        dmacr = mem32[base + _SSPDMACR]  # 드라이버(machine.SPI 의 DMA 경로)가 쓰는 비트 -> 끝나면 그대로 되돌림
+        mem32[base + _SSPDMACR] = dmacr | 0x02  # TXDMAE
+        d.config(read=buf, write=base + _SSPDR, count=len(buf),
+                 ctrl=d.pack_ctrl(size=0, inc_write=False, treq_sel=_DREQ_SPI_TX[self.spi_id]),
+                 trigger=True)
+        self._stall(t0)
+        while d.active():
+            await asyncio.sleep_ms(0)
+        t0 = time.ticks_us()
+        # 마지막 바이트가 시프트 아웃될 때까지(BSY) 기다린 뒤 DC/디먹스를 바꿀 수 있음
+        while mem32[base + _SSPSR] & 0x10:
+            pass
+        # 쓰기만 했으므로 RX FIFO는 버리고 overrun 플래그 해제
+        while mem32[base + _SSPSR] & 0x04:
+            mem32[base + _SSPDR]
+        mem32[base + _SSPICR] = 0x01
+        mem32[base + _SSPDMACR] = dmacr
+        self._stall(t0)
+
+# SPI 객체 -> SPIBus (SPI 를 직접 넘긴 패널들도 디먹스 선택 상태를 공유하도록)
+_buses = {}
+
+def shared_bus(spi, dc):
+    """spi 하나당 SPIBus 하나. 같은 spi 로 만든 패널은 같은 버스를 씀"""
+    bus = _buses.get(id(spi))
+    if bus is None:
+        bus = _buses[id(spi)] = SPIBus(spi, dc)
+    return bus
+
 # ====== Minimal ST7735 driver (multi CS 지원) ======
 class ST7735:
-    def __init__(self, spi, cs, dc, rst, width, height, rotation=0, bgr=False, xstart=0, ystart=0):
-        self.spi = spi
-        # 디먹스 입력핀(7,8,9)은 '항상' 준비해둠
-        self._demux_pins = {p: Pin(p, Pin.OUT, value=0) for p in PIN_CS}
-        # 이 인스턴스가 요구하는 비트 조합: 리스트에 포함된 핀은 HIGH, 그 외는 LOW
-        self._cs_bits = set(cs)  # 예: []=000, [7]=001, [8]=010, [7,8]=011, [9]=100 ...
+    def __init__(self, spi, cs, dc, rst, width, height, rotation=0, bgr=False, xstart=0, ystart=0, buffered=True):
+        # spi에 SPIBus를 넘기면 여러 패널이 같은 버스 상태(선택 주소)를 공유
+        # (SPI 를 그대로 넘겨도 spi 객체마다 하나의 SPIBus 를 공유)
+        self.bus = spi if isinstance(spi, SPIBus) else shared_bus(spi, dc)
+        self.spi = self.bus.spi
+        self.dc  = self.bus.dc
+        # 이 인스턴스의 디먹스 주소: 리스트에 포함된 핀은 HIGH, 그 외는 LOW
+        # 예: []=000, [7]=001, [8]=010, [7,8]=011, [9]=100 ...
+        self._addr = 0
+        for i, p in enumerate(PIN_CS):
+            if p in cs:
+                self._addr |= 1 << i
 
-        self.dc  = Pin(dc, Pin.OUT, value=0)
         self.rst = Pin(rst, Pin.OUT, value=1)
 
         self.width  = width
         self.height = height
+        self._native = (width, height)  # 회전 0 기준 크기 (set_rotation 이 여러 번 불려도 안전)
         self.rotation = rotation
         self.bgr = bgr
         self.xstart = xstart
         self.ystart = ystart
 
-        self.buffer = bytearray(self.width * self.height * 2)
-        self.fb = framebuf.FrameBuffer(self.buffer, self.width, self.height, framebuf.RGB565)
+        # buffered=False 면 전체 프레임버퍼 없이 draw list + 공유 Strip 으로만 그림 (show_list*)
+        self.buffer = bytearray(self.width * self.height * 2) if buffered else None
+        self.fb = framebuf.FrameBuffer(self.buffer, self.width, self.height, framebuf.RGB565) if buffered else None
 
-        # 글리프 버퍼 유지
-        self._gbuf = bytearray(8 * 8 * 2)
-        self._gfb  = framebuf.FrameBuffer(self._gbuf, 8, 8, framebuf.RGB565)
-        self._WHITE = 0xFFFF
-        self._BLACK = 0x0000
+        # 변경된 영역 목록 [x0, y0, x1, y1] (포함 좌표). 처음엔 전체 화면
+        self._dirty = [[0, 0, self.width - 1, self.height - 1]]
     
     def select(self, idx):
         """선택할 디스플레이 인덱스를 지정"""
@@ -80,13 +384,8 @@ class ST7735:
             pin(1)
     
     def _apply_demux_select(self):
-        """이 인스턴스에 해당하는 디먹스 주소(7,8,9)를 세팅합니다."""
-        # 주의: 항상 모든 입력을 명시적으로 0/1로 설정 (부동 방지)
-        for p in PIN_CS:
-            self._demux_pins[p](1 if p in self._cs_bits else 0)
-        # (필요 시 74HC138의 Enable 핀: G1=HIGH, /G2A=/G2B=LOW로 고정 연결)
-        
-        time.sleep_us(3)
+        """이 인스턴스에 해당하는 디먹스 주소(7,8,9)를 세팅합니다. (바뀔 때만 토글)"""
+        self.bus.select(self._addr)
 
     def _reset(self):
         self.rst(0)
@@ -94,23 +393,22 @@ class ST7735:
         self.rst(1)
         time.sleep_ms(120)
 
-    def _cmd(self, c):
-        self._apply_demux_select()  # 먼저 해당 패널 선택
-        self.dc(0)
-        self.spi.write(bytearray([c]))
-
-    def _data(self, d):
-        self._apply_demux_select()
-        self.dc(1)
-        self.spi.write(bytearray([d]))
+    def _cmd(self, c, params=None):
+        self.bus.cmd(self._addr, c, params)  # 선택은 버스가 필요할 때만
 
     def _init_regs(self):
 
         self._cmd(0x11)  # SLPOUT
         time.sleep_ms(120)
 
-        self._cmd(0x3A)  # COLMOD: Pixel format
-        self._data(0x05) # 16-bit color
+        self._init_config()
+        time.sleep_ms(50)
+
+        self._set_window(0, 0, self.width-1, self.height-1)
+
+    def _init_config(self):
+        """SLPOUT 이후 레지스터 설정 ~ DISPON (지연 없음, 뒤에 50ms 필요)"""
+        self._cmd(0x3A, b'\x05')  # COLMOD: Pixel format, 16-bit color
 
         madctl = 0x00
         if self.rotation == 1:
@@ -122,16 +420,12 @@ class ST7735:
         if self.bgr:
             madctl |= 0x08
 
-        self._cmd(0x36)
-        self._data(madctl)
+        self._cmd(0x36, bytes([madctl]))
 
         self._cmd(0x20)  # INVON
         self._cmd(0x13)  # NORON
         self._cmd(0x29)  # DISPON
-        time.sleep_ms(50)
 
-        self._set_window(0, 0, self.width-1, self.height-1)
-    
     def init_panel(self):
         """선택된 패널만 SWRESET으로 개별 초기화"""
         self._cmd(0x01)          # SWRESET (선택된 CS에만 적용)
@@ -148,194 +442,275 @@ class ST7735:
         x0 += xs; x1 += xs
         y0 += ys; y1 += ys
 
-        self._cmd(0x2A)
-        self._data(0x00); self._data(x0 & 0xFF)
-        self._data(0x00); self._data(x1 & 0xFF)
-        self._cmd(0x2B)
-        self._data(0x00); self._data(y0 & 0xFF)
-        self._data(0x00); self._data(y1 & 0xFF)
-        self._cmd(0x2C)
+        # CASET/RASET/RAMWR 를 하나의 시퀀스로 인코딩해 한 번에 전송
+        q = self.bus.seq
+        q[0] = 0x2A; q[1] = 4
+        q[2] = 0x00; q[3] = x0 & 0xFF; q[4] = 0x00; q[5] = x1 & 0xFF
+        q[6] = 0x2B; q[7] = 4
+        q[8] = 0x00; q[9] = y0 & 0xFF; q[10] = 0x00; q[11] = y1 & 0xFF
+        q[12] = 0x2C; q[13] = 0
+        self.bus.send_seq(self._addr, 14)
         
     def set_rotation(self, r):
         self.rotation = r & 3
         madctl = 0x00
+        w, h = self._native
         if self.rotation == 0:
             madctl = 0x00
-            self.width, self.height = self.width, self.height
+            self.width, self.height = w, h
         elif self.rotation == 1:
             madctl = 0x60 # MV|MX
-            self.width, self.height = self.height, self.width
+            self.width, self.height = h, w
         elif self.rotation == 2:
             madctl = 0xC0 # MY|MX
-            self.width, self.height = self.width, self.height
+            self.width, self.height = w, h
         elif self.rotation == 3:
             madctl = 0xA0 # MV|MY
-            self.width, self.height = self.height, self.width
+            self.width, self.height = h, w
         
         if self.bgr:
             madctl |= 0x08
 
-        self._cmd(0x36); self._data(madctl)
-        self.fb = framebuf.FrameBuffer(self.buffer, self.width, self.height, framebuf.RGB565) # 회전 바뀌면 전체 윈도우 재설정
+        self._cmd(0x36, bytes([madctl]))
+        if self.buffer is not None:
+            self.fb = framebuf.FrameBuffer(self.buffer, self.width, self.height, framebuf.RGB565) # 회전 바뀌면 전체 윈도우 재설정
         self._set_window(0, 0, self.width-1, self.height-1)
-
+        self._dirty = [[0, 0, self.width - 1, self.height - 1]]
+
+    # ---- Dirty 영역 관리 ----
+    def _mark(self, x, y, w, h):
+        """그려진 영역을 dirty 목록에 추가 (화면 밖은 잘라냄)"""
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = min(x + w, self.width) - 1
+        y1 = min(y + h, self.height) - 1
+        if x1 < x0 or y1 < y0:
+            return
+        d = self._dirty
+        d.append([x0, y0, x1, y1])
+        if len(d) > DIRTY_MAX:
+            # 너무 잘게 쪼개지면 외곽 사각형 하나로
+            self._dirty = [[min(r[0] for r in d), min(r[1] for r in d),
+                            max(r[2] for r in d), max(r[3] for r in d)]]
+
+    def _merge_dirty(self):
+        """겹치거나 가까운 dirty 사각형을 병합해 전송할 창 목록을 반환"""
+        rects = self._dirty
+        merged = True
+        while merged and len(rects) > 1:
+            merged = False
+            for i in range(len(rects)):
+                a = rects[i]
+                for j in range(i + 1, len(rects)):
+                    b = rects[j]
+                    x0 = min(a[0], b[0]); y0 = min(a[1], b[1])
+                    x1 = max(a[2], b[2]); y1 = max(a[3], b[3])
+                    area_u = (x1 - x0 + 1) * (y1 - y0 + 1)
+                    area_a = (a[2] - a[0] + 1) * (a[3] - a[1] + 1)
+                    area_b = (b[2] - b[0] + 1) * (b[3] - b[1] + 1)
+                    if area_u <= area_a + area_b + DIRTY_MERGE_SLACK:
+                        rects[i] = [x0, y0, x1, y1]
+                        rects.pop(j)
+                        merged = True
+                        break
+                if merged:
+                    break
+        return rects
+
+    # 아래 그리기 함수들은 논리 RGB565 색을 받아 패널 바이트 순서로 그림
+    # 각 함수는 그린 영역을 dirty로 기록
     def fill(self, col):
-        self.fb.fill(col)
+        self.fb.fill(_swap16(col))
+        self._dirty = [[0, 0, self.width - 1, self.height - 1]]
 
     def text(self, s, x, y, col=WHITE):
-        self.fb.text(s, x, y, col)
+        self.fb.text(s, x, y, _swap16(col))
+        self._mark(x, y, 8 * len(s), 8)
 
     def rect(self, x, y, w, h, col):
-        self.fb.rect(x, y, w, h, col)
+        self.fb.rect(x, y, w, h, _swap16(col))
+        self._mark(x, y, w, h)
 
     def fill_rect(self, x, y, w, h, col):
-        self.fb.fill_rect(x, y, w, h, col)
+        self.fb.fill_rect(x, y, w, h, _swap16(col))
+        self._mark(x, y, w, h)
 
     def hline(self, x, y, w, col):
-        self.fb.hline(x, y, w, col)
+        self.fb.hline(x, y, w, _swap16(col))
+        self._mark(x, y, w, 1)
 
     def vline(self, x, y, h, col):
-        self.fb.vline(x, y, h, col)
-
-    def show(self):
-        # 전체 창 지정
-        self._apply_demux_select()
-        self._set_window(0, 0, self.width - 1, self.height - 1)
-
-        n = len(self.buffer)
-        if not hasattr(self, "_txbuf") or len(self._txbuf) != n:
-            self._txbuf = bytearray(n)
-
-        src = memoryview(self.buffer)
-        dst = memoryview(self._txbuf)
-
-        # RGB565 엔디안 스왑
-        i = 0
-        while i < n:
-            b0 = src[i]; b1 = src[i+1]
-            dst[i]   = b1
-            dst[i+1] = b0
-            i += 2
-
-        self._apply_demux_select()
-        self.dc(1)
-        self.spi.write(dst)
+        self.fb.vline(x, y, h, _swap16(col))
+        self._mark(x, y, 1, h)
+
+    def _take_rects(self, full):
+        """이번에 보낼 창 목록을 꺼내고 dirty 목록을 비움"""
+        if full:
+            self._dirty = [[0, 0, self.width - 1, self.height - 1]]
+        if not self._dirty:
+            return ()
+        rects = self._merge_dirty()
+        self._dirty = []
+        for r in rects:
+            if (r[2] - r[0] + 1) * 4 >= self.width * 3:
+                # 폭이 넓으면 행 전체로 늘려 한 번에 연속 전송
+                r[0], r[2] = 0, self.width - 1
+        return rects
+
+    def show(self, full=False):
+        """변경된 영역만 전송. full=True면 전체 화면 전송"""
+        # 버퍼가 이미 패널 바이트 순서이므로 스왑/복사 없이 그대로 전송
+        buf = memoryview(self.buffer)
+        stride = self.width * 2
+        for x0, y0, x1, y1 in self._take_rects(full):
+            self._set_window(x0, y0, x1, y1)
+            self.dc(1)  # _set_window가 이미 이 패널을 선택해 둠
+            if x0 == 0 and x1 == self.width - 1:
+                self.spi.write(buf[y0 * stride:(y1 + 1) * stride])
+            else:
+                o = y0 * stride + x0 * 2
+                n = (x1 - x0 + 1) * 2
+                for _ in range(y1 - y0 + 1):
+                    self.spi.write(buf[o:o + n])
+                    o += stride
+
+    async def show_async(self, full=False):
+        """show()와 같지만 전송 중 이벤트 루프를 막지 않음 (DMA 또는 chunk 분할).
+        버스 lock을 잡으므로 다른 패널의 show_async와 섞이지 않음"""
+        buf = memoryview(self.buffer)
+        stride = self.width * 2
+        bus = self.bus
+        async with bus.lock:
+            for x0, y0, x1, y1 in self._take_rects(full):
+                self._set_window(x0, y0, x1, y1)
+                if x0 == 0 and x1 == self.width - 1:
+                    await bus.write_data_async(self._addr, buf[y0 * stride:(y1 + 1) * stride])
+                    continue
+                # 좁은 창은 행 단위 전송: chunk 만큼 쓰고 양보
+                self.dc(1)
+                o = y0 * stride + x0 * 2
+                n = (x1 - x0 + 1) * 2
+                sent = 0
+                t0 = time.ticks_us()
+                for _ in range(y1 - y0 + 1):
+                    self.spi.write(buf[o:o + n])
+                    o += stride
+                    sent += n
+                    if sent >= bus.chunk:
+                        bus._stall(t0)
+                        await asyncio.sleep_ms(0)
+                        t0 = time.ticks_us()
+                        sent = 0
+                        bus.select(self._addr)
+                        self.dc(1)
+                bus._stall(t0)
 
     def text_scaled(self, s, x, y, col, scale=2, bg=None, spacing=0):
-        cx = x
-        adv = (8 + spacing) * scale
-        for ch in s:
-            self._gfb.fill(self._BLACK)
-            self._gfb.text(ch, 0, 0, self._WHITE)
-            if bg is not None:
-                self.fb.fill_rect(cx, y, 8*scale, 8*scale, bg)
-            for yy in range(8):
-                for xx in range(8):
-                    if self._gfb.pixel(xx, yy) == self._WHITE:
-                        x0 = cx + xx*scale
-                        y0 = y  + yy*scale
-                        self.fb.fill_rect(x0, y0, scale, scale, col)
-            cx += adv
+        cx = _blit_text_scaled(self.fb, s, x, y, _swap16(col), scale,
+                               None if bg is None else _swap16(bg), spacing)
+        self._mark(x, y, cx - x, 8 * scale)
+
+    def draw_sprite(self, sp, x=0, y=0):
+        """미리 디코드된 Sprite(assets.py)를 투명 키와 함께 한 번에 blit"""
+        self.fb.blit(sp.fb, x, y, sp.key)
+        self._mark(x, y, sp.w, sp.h)
 
     def draw_bmp24(self, path, x=0, y=0, colkey=None):
-        def _rgb888_to_565(r, g, b):
-            return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-
-        with open(path, "rb") as f:
-            if f.read(2) != b"BM":
-                raise ValueError("Not a BMP")
-            f.read(8)  # file size + reserved
-            pixel_offset = int.from_bytes(f.read(4), "little")
-
-            dib = int.from_bytes(f.read(4), "little")
-            if dib < 40:
-                raise ValueError("Unsupported DIB header")
-
-            width  = int.from_bytes(f.read(4), "little", True)
-            height = int.from_bytes(f.read(4), "little", True)
-            planes = int.from_bytes(f.read(2), "little")
-            bpp    = int.from_bytes(f.read(2), "little")
-            comp   = int.from_bytes(f.read(4), "little")
-
-            if bpp != 24 or comp != 0:
-                raise ValueError("Need 24-bit uncompressed BMP")
-
-            skip = dib - 16
-            if skip > 0:
-                f.read(skip)
-
-            top_down = False
-            if height < 0:
-                height = -height
-                top_down = True
-
-            row_bytes = ((width * 3 + 3) // 4) * 4
-            f.seek(pixel_offset)
-
-            for row in range(height):
-                bmp_row = row if top_down else (height - 1 - row)
-                dst_y = y + bmp_row
-                line = f.read(row_bytes)
-                if not (0 <= dst_y < self.height):
-                    continue
-                idx = 0
-                for col in range(width):
-                    dst_x = x + col
-                    if 0 <= dst_x < self.width:
-                        b = line[idx]; g = line[idx+1]; r = line[idx+2]
-                        if (colkey is None) or (r, g, b) != colkey:
-                            self.fb.pixel(dst_x, dst_y, _rgb888_to_565(r, g, b))
-                    idx += 3
-
-# ====== Main Test ======
-def test_display():
-    spi = SPI(0, baudrate=SPI_BAUD, polarity=0, phase=0,
-              sck=Pin(PIN_SCK), mosi=Pin(PIN_MOSI))
-
-    # 전체 하드웨어 리셋(공유 RST): 한 번만
-    rst = Pin(PIN_RST, Pin.OUT, value=0)
-    time.sleep_ms(50)
-    rst(1)
+        # 최초 1회만 디코드(.bin 이 있으면 그대로 로드)하고 이후엔 캐시에서 blit
+        self.draw_sprite(assets.get_sprite(path, colkey), x, y)
+
+    # ---- 정적 레이어 (카드 템플릿) ----
+    def draw_layer(self, layer):
+        """정적 레이어 전체 복원 (fill 대신 사용)"""
+        layer.restore(self.fb)
+        self._dirty = [[0, 0, self.width - 1, self.height - 1]]
+
+    def restore_rect(self, layer, x, y, w, h):
+        """정적 레이어로 일부 영역만 되돌림 (이전 동적 필드 지우기). 그 영역만 dirty"""
+        layer.restore_rect(self.fb, x, y, w, h)
+        self._mark(x, y, w, h)
+
+    # ---- Draw list ----
+    def draw_list(self, ops):
+        """draw list를 프레임버퍼에 그리고 dirty 영역 기록 (buffered 모드)"""
+        draw_ops(self.fb, ops)
+        for op in ops:
+            b = op_bounds(op)
+            if b is None:
+                self._dirty = [[0, 0, self.width - 1, self.height - 1]]
+            else:
+                self._mark(*b)
+
+    def show_list(self, ops, strip):
+        """show_list_async의 동기 버전 (부팅 중 등 이벤트 루프 밖에서 사용)"""
+        rows = strip.rows
+        n_row = self.width * 2
+        for y0 in range(0, self.height, rows):
+            h = min(rows, self.height - y0)
+            draw_ops(strip.fb, ops, y0, h)
+            self._set_window(0, y0, self.width - 1, y0 + h - 1)
+            self.bus.write_data(self._addr, strip.mv[0:n_row * h])
+
+    async def show_list_async(self, ops, strip):
+        """프레임버퍼 없이 draw list를 strip 밴드마다 래스터화해 전송 (buffered=False 모드)"""
+        rows = strip.rows
+        n_row = self.width * 2
+        bus = self.bus
+        async with bus.lock:
+            for y0 in range(0, self.height, rows):
+                h = min(rows, self.height - y0)
+                draw_ops(strip.fb, ops, y0, h)
+                self._set_window(0, y0, self.width - 1, y0 + h - 1)
+                await bus.write_data_async(self._addr, strip.mv[0:n_row * h])
+
+    def stream_frame(self, f, strip):
+        """파일 f 의 원시 프레임(패널 바이트 순서 RGB565)을 strip 크기씩 읽어 그대로 전송 (디코드/그리기 없음)"""
+        rows = strip.rows
+        n_row = self.width * 2
+        for y0 in range(0, self.height, rows):
+            h = min(rows, self.height - y0)
+            f.readinto(strip.mv[0:n_row * h])
+            self._set_window(0, y0, self.width - 1, y0 + h - 1)
+            self.bus.write_data(self._addr, strip.mv[0:n_row * h])
+
+    async def stream_frame_async(self, f, strip):
+        rows = strip.rows
+        n_row = self.width * 2
+        bus = self.bus
+        async with bus.lock:
+            for y0 in range(0, self.height, rows):
+                h = min(rows, self.height - y0)
+                f.readinto(strip.mv[0:n_row * h])
+                self._set_window(0, y0, self.width - 1, y0 + h - 1)
+                await bus.write_data_async(self._addr, strip.mv[0:n_row * h])
+
+
+# ---- 여러 패널 동시 초기화: 단계마다 모든 패널에 명령을 보내고 지연은 한 번만 (지연이 겹침) ----
+def init_panels(panels):
+    """init_panel() 을 패널마다 차례로 부르는 것과 같은 결과, 지연 합계는 패널 수와 무관"""
+    for p in panels:
+        p._cmd(0x01)             # SWRESET
+    time.sleep_ms(150)
+    for p in panels:
+        p._cmd(0x11)             # SLPOUT
     time.sleep_ms(120)
-
-    # 필요 시 BL PWM
-    try:
-        bl = PWM(Pin(PIN_BL)); bl.freq(1000); bl.duty_u16(65535)
-    except:
-        pass
-
-    # 패널 인스턴스 생성
-    tft_list = []
-    tft_list.append(ST7735(spi, cs=[],      dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # ABC=000 -> Y0
-    tft_list.append(ST7735(spi, cs=[7],     dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 001 -> Y1
-    tft_list.append(ST7735(spi, cs=[8],     dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 010 -> Y2
-    tft_list.append(ST7735(spi, cs=[7,8],   dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 011 -> Y3
-
-    # 각 패널 SWRESET + 레지스터 초기화
-    for tft in tft_list:
-        tft.init_panel()
-    
-    
-    # 테스트 그리기
-    colors = [GREEN, YELLOW, RED, RED]
-    
-    # 디스플레이 초기 상태
-    for i, tft in enumerate(tft_list):
-        tft.set_rotation(1)
-        tft.fill(RED)
-        tft.draw_bmp24("image_50_medium.bmp", x=10, y=10, colkey=(255, 255, 255))
-        tft.show()
-
-    
-    for i, tft in enumerate(tft_list):
-        tft.fill(colors[i])
-        tft.text("99999999", 80, 20, BLACK)
-        tft.text("Kim Tae Gyun", 60, 40, BLACK)
-        tft.text_scaled("SC", 65, 75, BLACK, scale=5,)
-        tft.draw_bmp24("image_50_medium.bmp", x=10, y=10, colkey=(255, 255, 255))
-        tft.show()
-
-
-if __name__ == "__main__":
-    test_display()
-
+    for p in panels:
+        p._init_config()         # COLMOD ~ DISPON
+    time.sleep_ms(50)
+    for p in panels:
+        p.set_rotation(p.rotation)
+
+
+async def init_panels_async(panels):
+    """init_panels 의 비동기 버전: 기다리는 동안 BLE 등 다른 태스크가 돎"""
+    for p in panels:
+        p._cmd(0x01)             # SWRESET
+    await asyncio.sleep_ms(150)
+    for p in panels:
+        p._cmd(0x11)             # SLPOUT
+    await asyncio.sleep_ms(120)
+    for p in panels:
+        p._init_config()         # COLMOD ~ DISPON
+    await asyncio.sleep_ms(50)
+    for p in panels:
+        p.set_rotation(p.rotation)
@@ -1,66 +1,305 @@
 # display_controller.py
 from machine import Pin, SPI, PWM
-from display import *
+import os
+import struct
+import time
+import uasyncio as asyncio
+import tracing
+from display import (SPIBus, ST7735, Strip, StaticLayer, draw_ops, op_bounds,
+                     init_panels, init_panels_async, PIN_CS, PIN_DC, PIN_RST, WIDTH, HEIGHT,
+                     RED, GREEN, YELLOW, BLACK, OP_TEXT, OP_TEXT_SCALED, OP_BMP, OP_LAYER)
+from slot_allocator import SlotAllocator
+from journal import OP_YELLOW, OP_GREEN, REPLAY_BUDGET_MS
+
+LOGO = "image_50_medium.bmp"
+
+# 부팅 화면 캐시: 회전 후 패널 바이트 순서 RGB565 프레임 원본. 다음 부팅부터 디코드/그리기 없이 바로 전송
+SPLASH        = "splash.bin"
+SPLASH_MAGIC  = b"SF"
+SPLASH_HEADER = "<2sHHHI"   # magic, width, height, 배경색, 로고 파일 크기 (다르면 다시 만듦)
+
+# True면 패널별 40KB 프레임버퍼 없이 공유 strip(STRIP_ROWS 행) 하나로 밴드 렌더링
+# -> 디스플레이 메모리가 패널 수와 무관하게 고정 (패널을 늘릴 때 사용)
+BANDED = False
+BUFFERED_MAX = 4   # 패널별 프레임버퍼는 이 수까지만 (8개면 320KB 로 Pico W RAM 초과 -> 자동으로 banded)
+
+
+def panel_array(n, rotation=1, xstart=0, ystart=0):
+    """디먹스 출력 Y0..Y(n-1) 에 차례로 연결된 같은 방향 패널 n 개의 설정"""
+    return [{"addr": i, "rotation": rotation, "xstart": xstart, "ystart": ystart} for i in range(n)]
+
+
+# 패널 배열 (선언형). 항목 순서 = 패널 인덱스 (슬롯 번호, 저널 기록)
+#   addr: 74HC138 주소 0..7 (PIN_CS 비트), rotation: 0~3, xstart/ystart: 패널 GRAM 오프셋
+# 예) 8개: panel_array(8) / 뒤집어 단 패널: {"addr": 5, "rotation": 3}
+PANELS = panel_array(4)
 
 
 class displayController:
-    tft_list = []
-    info_list = [] # info -> [number, name, route]
-    CURRENT = 0
-    
-    def __init__(self):
+    def __init__(self, banded=None, journal=None, start=True, panels=PANELS):
+        """start=False 면 패널에 아무것도 보내지 않고 객체만 만듦 -> 이후 await start_async()
+        banded=None 이면 BANDED 설정, 패널이 BUFFERED_MAX 보다 많으면 banded"""
+        if banded is None:
+            banded = BANDED or len(panels) > BUFFERED_MAX
+        self.banded = banded
         spi = SPI(0, baudrate=20_000_000, polarity=0, phase=0,
               sck=Pin(18), mosi=Pin(19))
+        self._rst = Pin(15, Pin.OUT, value=1)
 
-        # 하드웨어 리셋 한 번
-        rst = Pin(15, Pin.OUT, value=0); import time; time.sleep_ms(50); rst(1); time.sleep_ms(120)
-        
-        # 패널 0~3 생성
-        self.tft_list.append(ST7735(spi, cs=[],      dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # ABC=000 -> Y0
-        self.tft_list.append(ST7735(spi, cs=[7],     dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 001 -> Y1
-        self.tft_list.append(ST7735(spi, cs=[8],     dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 010 -> Y2
-        self.tft_list.append(ST7735(spi, cs=[7,8],   dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 011 -> Y3
+        # 설정대로 패널 생성 (디먹스 선택 상태를 공유하는 하나의 버스)
+        bus = SPIBus(spi, PIN_DC)
+        self.tft_list = [self._panel(bus, spec) for spec in self._check(panels)]
 
-        # 각 패널 SWRESET + 레지스터 초기화
-        for tft in self.tft_list:
-            tft.init_panel()
+        # 렌더 큐: 패널별 대기 상태 슬롯 하나씩 (같은 패널의 여러 갱신은 마지막 것만 그림)
+        self._pending = [None] * len(self.tft_list)
+        self._t_post = [0] * len(self.tft_list)    # 대기 시작 시각 (ticks_us)
+        self._t_in = [None] * len(self.tft_list)   # 대기 중 요청의 가장 이른 입력 도착 시각
+        self._wake = asyncio.Event()
+        self._strip = None
+        self._templates = {}                       # 배경색 -> StaticLayer
+        self._shown = [None] * len(self.tft_list)  # 패널별 (배경색, 화면에 그려진 동적 op)
+        # 환자 번호 -> 패널 (패널 수만큼만 기억, 넘치면 가장 오래된 패널 재사용)
+        self.slots = SlotAllocator(len(self.tft_list))
+        self._cards = [None] * len(self.tft_list)  # 패널별 마지막으로 요청한 카드 상태
+        # 상태 저널 (리셋 후 복구용). compaction 때는 현재 카드들만 다시 씀
+        self.journal = journal
+        if journal is not None:
+            journal.snapshot = self._snapshot
 
-        
-        
-        self.display_init()
+        if start:
+            # 하드웨어 리셋 한 번 + 모든 패널 동시 초기화 (지연이 겹침)
+            self._rst(0); time.sleep_ms(50); self._rst(1); time.sleep_ms(120)
+            init_panels(self.tft_list)
+            self.display_init()
+
+    @staticmethod
+    def _check(panels):
+        """패널 설정 검사: 주소 범위/중복, 회전 후 크기가 모두 같은지 (카드 레이아웃과 strip 을 공유)"""
+        if not panels:
+            raise ValueError("no panels")
+        seen = set()
+        odd = panels[0].get("rotation", 1) & 1
+        for spec in panels:
+            a = spec["addr"]
+            if not 0 <= a < 1 << len(PIN_CS) or a in seen:
+                raise ValueError("bad demux addr %r" % a)
+            seen.add(a)
+            if spec.get("rotation", 1) & 1 != odd:
+                raise ValueError("mixed panel orientation")
+        return panels
+
+    def _panel(self, bus, spec):
+        # 초기화가 끝나면(init_panels) spec 의 회전으로 설정됨
+        a = spec["addr"]
+        cs = [p for i, p in enumerate(PIN_CS) if a >> i & 1]
+        return ST7735(bus, cs=cs, dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT,
+                      rotation=spec.get("rotation", 1), bgr=False,
+                      xstart=spec.get("xstart", 0), ystart=spec.get("ystart", 0),
+                      buffered=not self.banded)
+
+    async def start_async(self):
+        """비동기 부팅: 리셋/초기화 지연 동안 이벤트 루프(BLE 광고/연결 등)가 계속 돎"""
+        self._rst(0)
+        await asyncio.sleep_ms(50)
+        self._rst(1)
+        await asyncio.sleep_ms(120)
+        await init_panels_async(self.tft_list)
+        with self._open_splash() as f:
+            for i in range(len(self.tft_list)):
+                await self._show_splash(i, f)
+                await asyncio.sleep_ms(0)
 
     def display_init(self):
-        # 디스플레이 초기 상태
-        for i, tft in enumerate(self.tft_list):
-            tft.set_rotation(1)
-            tft.fill(RED)
-            tft.draw_bmp24("image_50_medium.bmp", x=10, y=10, colkey=(255, 255, 255))
-            tft.show()
-            
-    def paint_the_town_yellow(self, info):
+        # 디스플레이 초기 상태 (부팅 중이라 렌더 태스크 없이 바로 그림)
+        with self._open_splash() as f:
+            for i in range(len(self.tft_list)):
+                self._show_splash(i, f, sync=True)
+
+    # ---- 부팅 화면 (빨간 카드 + 로고) 캐시 ----
+    def _splash_header(self):
+        tft = self.tft_list[0]
+        try:
+            src = os.stat(LOGO)[6]
+        except OSError:
+            src = 0
+        return struct.pack(SPLASH_HEADER, SPLASH_MAGIC, tft.width, tft.height, RED, src)
+
+    def _open_splash(self):
+        """헤더가 맞는 캐시 파일을 프레임 시작 위치로 열어 반환. 없거나 낡았으면 한 번 그려서 저장"""
+        hdr = self._splash_hdr = self._splash_header()
+        try:
+            f = open(SPLASH, "rb")
+            if f.read(len(hdr)) == hdr:
+                return f
+            f.close()
+        except OSError:
+            pass
+        tft = self.tft_list[0]
+        if self._strip is None:
+            self._strip = Strip(tft.width)  # 회전 후 폭 기준, 모든 패널 공용
+        ops = self._card_ops((RED, None, False))
+        with open(SPLASH, "wb") as f:
+            f.write(hdr)
+            strip = self._strip
+            rows = strip.rows
+            for y0 in range(0, tft.height, rows):
+                h = min(rows, tft.height - y0)
+                draw_ops(strip.fb, ops, y0, h)
+                f.write(strip.mv[0:tft.width * 2 * h])
+        f = open(SPLASH, "rb")
+        f.read(len(hdr))
+        return f
+
+    def _show_splash(self, i, f, sync=False):
+        """캐시 프레임을 패널 i 에 전송 (sync=False 면 awaitable 반환)"""
+        tft = self.tft_list[i]
+        f.seek(len(self._splash_hdr))
+        self._shown[i] = (RED, [])
+        if self.banded:
+            if self._strip is None:
+                self._strip = Strip(tft.width)
+            if sync:
+                return tft.stream_frame(f, self._strip)
+            return tft.stream_frame_async(f, self._strip)
+        # buffered: 프레임버퍼에 그대로 읽어 넣어 이후 부분 갱신이 화면과 일치하게 함
+        f.readinto(tft.buffer)
+        if sync:
+            return tft.show(full=True)
+        return tft.show_async(full=True)
+
+    def _template(self, bg):
+        """배경색별 정적 레이어(배경 + 로고)를 처음 한 번만 합성"""
+        t = self._templates.get(bg)
+        if t is None:
+            t = StaticLayer(bg, [(OP_BMP, LOGO, 10, 10, (255, 255, 255))])
+            self._templates[bg] = t
+        return t
+
+    def _dynamic_ops(self, state):
+        """카드에서 바뀌는 부분(번호, 이름, route)만의 draw list"""
+        bg, info, show_route = state
+        ops = []
+        if info is not None:
+            ops.append((OP_TEXT, info[0], 80, 20, BLACK))
+            ops.append((OP_TEXT, info[1], 60, 40, BLACK))
+            if show_route:
+                ops.append((OP_TEXT_SCALED, info[2], 65, 75, BLACK, 5))
+        return ops
+
+    def _card_ops(self, state):
+        """카드 상태 (배경색, [number, name, route] 또는 None, route 크게 표시 여부) -> draw list"""
+        return [(OP_LAYER, self._template(state[0]))] + self._dynamic_ops(state)
+
+    def _draw(self, i, state):
+        """buffered 모드: 같은 템플릿이면 이전 동적 필드 자리만 레이어로 되돌리고 새 필드를 그림"""
+        tft = self.tft_list[i]
+        layer = self._template(state[0])
+        dyn = self._dynamic_ops(state)
+        prev = self._shown[i]
+        if prev is not None and prev[0] == state[0]:
+            for op in prev[1]:
+                tft.restore_rect(layer, *op_bounds(op))
+        else:
+            tft.draw_layer(layer)
+        tft.draw_list(dyn)
+        self._shown[i] = (state[0], dyn)
+
+    async def _render(self, i, state, t_post=None, t_in=None):
+        tft = self.tft_list[i]
+        t0 = time.ticks_us()
+        if t_post is not None:
+            tracing.add(tracing.ST_QUEUE, time.ticks_diff(t0, t_post))
+        if self.banded:
+            await tft.show_list_async(self._card_ops(state), self._strip)
+            tracing.span(tracing.ST_RENDER, t0)
+        else:
+            self._draw(i, state)
+            t1 = tracing.span(tracing.ST_RENDER, t0)
+            await tft.show_async()
+            tracing.span(tracing.ST_FLUSH, t1)
+        if t_in is not None:
+            tracing.span(tracing.ST_TOTAL, t_in)
+
+    def post(self, i, state, t_in=None):
+        """패널 i의 원하는 상태를 등록하고 바로 반환 (실제 그리기는 run() 태스크).
+        t_in: 이 갱신을 일으킨 입력의 도착 시각 (ticks_us, 끝단 지연 추적용)"""
+        if self._pending[i] is None:
+            self._t_post[i] = time.ticks_us()
+        if t_in is not None and self._t_in[i] is None:
+            self._t_in[i] = t_in
+        self._pending[i] = state
+        self._cards[i] = state
+        self._wake.set()
+
+    async def run(self):
+        """렌더 태스크: 대기 중인 패널만 그리고, 전송 중/패널 사이마다 이벤트 루프에 양보"""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            for i in range(len(self._pending)):
+                state = self._pending[i]
+                if state is None:
+                    continue
+                self._pending[i] = None
+                t_in = self._t_in[i]
+                self._t_in[i] = None
+                await self._render(i, state, self._t_post[i], t_in)
+                await asyncio.sleep_ms(0)
+
+    def paint_the_town_yellow(self, info, t_in=None):
         #바코드 스캐너로 주사기 qr 인식
-        self.tft_list[self.CURRENT].fill(YELLOW)
-        self.tft_list[self.CURRENT].text(info[0], 80, 20, BLACK)
-        self.tft_list[self.CURRENT].text(info[1], 60, 40, BLACK)
-        self.tft_list[self.CURRENT].draw_bmp24("image_50_medium.bmp", x=10, y=10, colkey=(255, 255, 255))
-        self.tft_list[self.CURRENT].show()
-        self.CURRENT = (self.CURRENT + 1) % 4
-        self.info_list.append(info)
-
-    def paint_the_town_green(self, info):
-        #환자 qr인식 성공
-        for i in range(len(self.info_list)):
-            if self.info_list[i][0] == info[0]:
-                self.tft_list[i].fill(GREEN)
-                self.tft_list[i].text(info[0], 80, 20, BLACK)
-                self.tft_list[i].text(info[1], 60, 40, BLACK)
-                self.tft_list[i].text_scaled(info[2], 65, 75, BLACK, scale=5,)
-                self.tft_list[i].draw_bmp24("image_50_medium.bmp", x=10, y=10, colkey=(255, 255, 255))
-                self.tft_list[i].show()
-            else:
+        i = self.slots.assign(info[0])
+        self.post(i, (YELLOW, info, False), t_in)
+        self._log(OP_YELLOW, i, info)
+        return i
+
+    def paint_the_town_green(self, info, t_in=None):
+        #환자 qr인식 성공 (번호로 패널을 바로 찾음, 이미 초록이면 무시)
+        i = self.slots.lookup(info[0])
+        if i is None:
+            return None
+        card = self._cards[i]
+        if card is not None and card[0] == GREEN:
+            return None
+        self.post(i, (GREEN, info, True), t_in)
+        self._log(OP_GREEN, i, info)
+        return i
+
+    def _log(self, op, i, info):
+        if self.journal is not None:
+            self.journal.append(op, bytes((i,)) + "-".join(info).encode())
+
+    def _snapshot(self):
+        """현재 카드들을 배정 순서대로 저널 레코드로 (재생하면 같은 배정/색이 됨)"""
+        recs = []
+        for i in self.slots.order():
+            card = self._cards[i]
+            if card is None or card[1] is None:
                 continue
-            
-    
-            
+            payload = bytes((i,)) + "-".join(card[1]).encode()
+            recs.append((OP_YELLOW, payload))
+            if card[0] == GREEN:
+                recs.append((OP_GREEN, payload))
+        return recs
+
+    def restore(self, budget_ms=REPLAY_BUDGET_MS):
+        """부팅 시 저널을 한 번 재생해 패널 배정/카드를 복구하고 패널마다 한 번씩 다시 그림"""
+        if self.journal is None:
+            return 0, True
 
+        def apply(op, payload):
+            i = payload[0]
+            if i >= len(self._cards):
+                return   # 패널 구성이 바뀐 뒤의 옛 기록
+            info = payload[1:].decode().split('-')
+            if op == OP_YELLOW:
+                self.slots.place(info[0], i)
+                self._cards[i] = (YELLOW, info, False)
+            elif op == OP_GREEN and self.slots.lookup(info[0]) == i:
+                self._cards[i] = (GREEN, info, True)
 
+        n, complete = self.journal.replay(apply, budget_ms)
+        for i, card in enumerate(self._cards):
+            if card is not None:
+                self.post(i, card)
+        return n, complete
@@ -0,0 +1,17 @@
+# ble_advertising_demo.py
+# 광고 페이로드를 만들고 다시 해석해 보는 예제 (펌웨어 import 경로 밖)
+import bluetooth
+from ble_advertising import advertising_payload, decode_name, decode_services
+
+
+def demo():
+    payload = advertising_payload(
+        name="micropython",
+        services=[bluetooth.UUID(0x181A), bluetooth.UUID("6E400001-B5A3-F393-E0A9-E50E24DCCA9E")],
+    )
+    print(payload)
+    print(decode_name(payload))
+    print(decode_services(payload))
+
+
+demo()
@@ -0,0 +1,19 @@
+# ble_qr_receiver_demo.py
+# 디스플레이 없이 BLE 로 받은 QR 메시지를 출력만 하는 예제 (펌웨어 import 경로 밖)
+import uasyncio as asyncio
+from ble_qr_receiver import BLEQRReceiver
+
+
+async def consumer(receiver: BLEQRReceiver):
+    while True:
+        msg = await receiver.get_msg()
+        print("QR:", msg)
+
+async def main():
+    r = BLEQRReceiver()
+    asyncio.create_task(consumer(r))
+    while True:
+        await asyncio.sleep(1)
+
+
+asyncio.run(main())
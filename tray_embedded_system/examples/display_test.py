@@ -0,0 +1,59 @@
+# display_test.py
+# 패널 4개에 부팅 화면 -> 카드 색/글자를 차례로 그려 보는 하드웨어 확인용 예제 (펌웨어 import 경로 밖)
+#   mpremote run examples/display_test.py   (display.py/assets.py/로고가 보드에 있어야 함)
+from machine import Pin, SPI, PWM
+import time
+from display import (SPIBus, ST7735, SPI_BAUD, PIN_SCK, PIN_MOSI, PIN_DC, PIN_RST,
+                     WIDTH, HEIGHT, ROTATION, RED, GREEN, YELLOW, BLACK)
+
+
+def test_display():
+    spi = SPI(0, baudrate=SPI_BAUD, polarity=0, phase=0,
+              sck=Pin(PIN_SCK), mosi=Pin(PIN_MOSI))
+
+    # 전체 하드웨어 리셋(공유 RST): 한 번만
+    rst = Pin(PIN_RST, Pin.OUT, value=0)
+    time.sleep_ms(50)
+    rst(1)
+    time.sleep_ms(120)
+
+    # 필요 시 BL PWM
+    try:
+        bl = PWM(Pin(PIN_BL)); bl.freq(1000); bl.duty_u16(65535)
+    except:
+        pass
+
+    # 패널 인스턴스 생성 (하나의 버스를 공유)
+    bus = SPIBus(spi, PIN_DC)
+    tft_list = []
+    tft_list.append(ST7735(bus, cs=[],      dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # ABC=000 -> Y0
+    tft_list.append(ST7735(bus, cs=[7],     dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 001 -> Y1
+    tft_list.append(ST7735(bus, cs=[8],     dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 010 -> Y2
+    tft_list.append(ST7735(bus, cs=[7,8],   dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT, rotation=ROTATION, bgr=False))      # 011 -> Y3
+
+    # 각 패널 SWRESET + 레지스터 초기화
+    for tft in tft_list:
+        tft.init_panel()
+    
+    
+    # 테스트 그리기
+    colors = [GREEN, YELLOW, RED, RED]
+    
+    # 디스플레이 초기 상태
+    for i, tft in enumerate(tft_list):
+        tft.set_rotation(1)
+        tft.fill(RED)
+        tft.draw_bmp24("image_50_medium.bmp", x=10, y=10, colkey=(255, 255, 255))
+        tft.show()
+
+    
+    for i, tft in enumerate(tft_list):
+        tft.fill(colors[i])
+        tft.text("99999999", 80, 20, BLACK)
+        tft.text("Kim Tae Gyun", 60, 40, BLACK)
+        tft.text_scaled("SC", 65, 75, BLACK, scale=5,)
+        tft.draw_bmp24("image_50_medium.bmp", x=10, y=10, colkey=(255, 255, 255))
+        tft.show()
+
+
+test_display()
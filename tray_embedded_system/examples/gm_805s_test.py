@@ -0,0 +1,62 @@
+# gm_805s_test.py
+# GM805S 스캐너 동작 확인용 예제 (펌웨어 import 경로 밖)
+#   mpremote run examples/gm_805s_test.py   (gm_805s.py/tracing.py 가 보드에 있어야 함)
+import time
+import uasyncio as asyncio
+from gm_805s import GM805
+
+
+def test_gm_805s():
+    UART_ID = 0   # Pico: UART0=(GP0,GP1), UART1=(GP8,GP9) 등
+    TX_PIN  = 12   # Pico TX -> GM805S RX
+    RX_PIN  = 13   # Pico RX -> GM805S TX
+    scanner = GM805(uart_id=UART_ID, tx=TX_PIN, rx=RX_PIN, baudrate=9600)
+
+    # (선택) 명령 트리거 모드로 전환 후 저장
+    scanner.set_command_trigger_mode(persist=False)
+
+    print("GM805S ready. Triggering & reading...")
+    while True:
+        # 소프트 트리거 한 번
+        scanner.trigger_once()
+
+        # 바코드 수신 대기
+        code = scanner.read_code(timeout_ms=2000)
+        if code:
+            print("BARCODE:", code)
+        else:
+            print("No read")
+        time.sleep(2)
+
+async def main_pico():
+    # 핀은 동기 테스트와 동일
+    UART_ID = 0     # Pico: UART0=(GP0,GP1)
+    TX_PIN  = 12    # Pico TX -> GM805S RX
+    RX_PIN  = 13    # Pico RX -> GM805S TX
+
+    scanner = GM805(uart_id=UART_ID, tx=TX_PIN, rx=RX_PIN, baudrate=9600)
+
+    # (선택) 커맨드 트리거 모드로 전환 (영구 저장은 False)
+    scanner.set_command_trigger_mode(persist=False)
+
+    print("GM805S async test. Triggering & awaiting reads...")
+    while True:
+        # ★ 비블로킹 트리거: ACK 미대기(fire-and-forget)
+        scanner.trigger_fire_and_forget()
+        # 트리거 스파밍 방지 약간의 간격
+        await asyncio.sleep_ms(50)
+
+        # ★ 비동기 수신
+        code = await scanner.read_code_async(timeout_ms=2000, idle_gap_ms=40)
+
+        if code:
+            print("BARCODE:", code)
+        else:
+            print("No read")
+
+        # 다음 트리거 전 쿨다운(환경에 맞게 조정)
+        await asyncio.sleep_ms(2000)
+
+
+asyncio.run(main_pico())
+#test_gm_805s()
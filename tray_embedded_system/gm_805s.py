@@ -2,6 +2,144 @@
 from machine import UART, Pin
 import time
 import uasyncio as asyncio
+import micropython
+from array import array
+import tracing
+
+# ---- CRC-CCITT (poly 0x1021, init 0x0000), 매뉴얼 기준: TYPE~DATA 구간(헤더 7E 00 제외)에 대해 계산 ----
+def _make_crc_table():
+    t = array("H", bytes(512))
+    for i in range(256):
+        c = i << 8
+        for _ in range(8):
+            c = ((c << 1) ^ 0x1021) & 0xFFFF if c & 0x8000 else (c << 1) & 0xFFFF
+        t[i] = c
+    return t
+
+_CRC_TABLE = _make_crc_table()  # 256 x 16bit = 512 B
+
+def crc_ccitt(data, crc=0):
+    """테이블 기반 CRC-CCITT (바이트당 룩업 1회)"""
+    t = _CRC_TABLE
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ t[((crc >> 8) ^ b) & 0xFF]
+    return crc
+
+@micropython.viper
+def _crc_ccitt_viper(data: ptr8, n: int, table: ptr16) -> int:
+    crc = 0
+    for i in range(n):
+        crc = ((crc << 8) & 0xFFFF) ^ table[((crc >> 8) ^ data[i]) & 0xFF]
+    return crc
+
+def crc_ccitt_fast(data):
+    """viper 커널 사용 (data는 bytes/bytearray/memoryview)"""
+    return _crc_ccitt_viper(data, len(data), _CRC_TABLE)
+
+class _Request:
+    """응답(HDR2 프레임)을 기다리는 명령 하나. 응답은 보낸 순서대로 매칭"""
+    __slots__ = ("expect_len", "deadline", "resp", "ev", "nowait")
+
+    def __init__(self, expect_len, deadline, ev, nowait=False):
+        self.expect_len = expect_len  # 기대하는 응답 LEN (None이면 아무거나)
+        self.deadline = deadline      # ticks_ms 기한
+        self.resp = None
+        self.ev = ev                  # 비동기 대기용 Event (블로킹/무대기는 None)
+        self.nowait = nowait          # 아무도 응답을 기다리지 않음 (잃어도 뒤 요청의 응답을 막지 않게 건너뜀)
+
+
+class ZoneShadow:
+    """GM805 존 비트의 로컬 사본.
+    연속 구간을 read_zone 한 번으로 읽어 두고, 변경은 로컬에 모았다가
+    바뀐 바이트만 연속 구간별 multi-byte write_zone 으로 커밋"""
+    MERGE_GAP = 8  # 사이의 값을 알고 있으면 이만큼 떨어진 구간도 하나의 쓰기로 합침 (패킷 오버헤드 9B)
+
+    def __init__(self, dev):
+        self._dev = dev
+        self._val = {}     # addr -> 장치에 있는 값 (마지막으로 읽었거나 쓴 값)
+        self._staged = {}  # addr -> 커밋 대기 값
+
+    def _store(self, addr, data):
+        if data is None:
+            return False
+        for i in range(len(data)):
+            self._val[addr + i] = data[i]
+        return True
+
+    def load(self, addr, length=1):
+        """[addr, addr+length) 를 한 번의 read_zone 으로 읽어 사본 갱신"""
+        return self._store(addr, self._dev.read_zone(addr, length))
+
+    async def load_async(self, addr, length=1):
+        return self._store(addr, await self._dev.read_zone_async(addr, length))
+
+    def known(self, addr):
+        return addr in self._val
+
+    def get(self, addr, default=0):
+        v = self._staged.get(addr)
+        if v is None:
+            v = self._val.get(addr, default)
+        return v
+
+    def set(self, addr, value):
+        value &= 0xFF
+        if self._val.get(addr) == value:
+            self._staged.pop(addr, None)  # 장치 값과 같으면 쓸 필요 없음
+        else:
+            self._staged[addr] = value
+
+    def update_bits(self, addr, mask, bits):
+        self.set(addr, (self.get(addr) & ~mask) | (bits & mask))
+
+    def _runs(self):
+        """커밋할 (시작 주소, bytes) 목록. 가까운 구간은 알고 있는 값으로 메워 합침"""
+        addrs = sorted(self._staged)
+        runs = []
+        i = 0
+        while i < len(addrs):
+            start = end = addrs[i]
+            i += 1
+            while i < len(addrs):
+                nxt = addrs[i]
+                if nxt - end - 1 > self.MERGE_GAP:
+                    break
+                if any((a not in self._val) for a in range(end + 1, nxt)):
+                    break
+                end = nxt
+                i += 1
+            runs.append((start, bytes([self.get(a) for a in range(start, end + 1)])))
+        return runs
+
+    def _committed(self, start, data):
+        for k in range(len(data)):
+            self._val[start + k] = data[k]
+            self._staged.pop(start + k, None)
+
+    def commit(self, save=False):
+        """바뀐 값만 쓰고(save=True면 flash 저장 1회) 쓴 패킷 수 반환"""
+        n = 0
+        for start, data in self._runs():
+            if self._dev.ack_ok(self._dev.write_zone(start, data)):
+                self._committed(start, data)
+                n += 1
+        if n and save:
+            self._dev.save_zone_to_flash()
+        return n
+
+    async def commit_async(self, save=False):
+        """commit()의 비동기 버전. 독립 구간 쓰기는 파이프라인으로 동시에 송신"""
+        runs = self._runs()
+        res = await asyncio.gather(*[self._dev.write_zone_async(st, d) for st, d in runs])
+        n = 0
+        for (start, data), resp in zip(runs, res):
+            if self._dev.ack_ok(resp):   # NAK 면 staged 값을 남겨 다음 commit 에서 다시 씀
+                self._committed(start, data)
+                n += 1
+        if n and save:
+            await self._dev.save_zone_to_flash_async()
+        return n
+
 
 class GM805:
     # ---- Protocol constants (from manual) ----
@@ -13,85 +151,237 @@ class GM805:
     # Zone addresses (subset)
     ZONE_MODE_ADDR   = 0x0000  # bits1-0: 00 Manual, 01 Command, 10 Continuous, 11 Induction
     ZONE_TRIGGER_ADDR= 0x0002  # bit0: Command trigger flag (auto-clear after scan)
+    ZONE_SAME_CODE_ADDR = 0x0013  # bit7: 같은 코드 재출력 지연 사용, bits6-0: 지연 시간 (x100ms)
+    # Scan modes (ZONE_MODE_ADDR bits1-0)
+    MODE_MANUAL     = 0x00
+    MODE_COMMAND    = 0x01
+    MODE_CONTINUOUS = 0x02     # 계속 스캔, 읽히면 바로 출력
+    MODE_INDUCTION  = 0x03     # 화면 변화(물체 감지) 시 스캔
+    # Stream reader
+    RX_BUF   = 256             # 수신 버퍼 (미리 할당, 처리한 만큼 앞으로 당겨 재사용)
+    CODE_MAX = 8               # 대기 중인 완성 바코드 최대 개수 (넘으면 오래된 것 버림)
+    ACK_MAX  = 4               # 대기 중인 응답(HDR2) 프레임 최대 개수
+    # Command engine
+    ACK_TIMEOUT_MS = 300
+    ACK_WINDOW_MS  = 50        # 무대기 송신의 응답이 이 안에 안 오면 잃은 것으로 봄 (9600bps 왕복 ~15ms + 장치 처리)
+    USE_CRC        = True      # 테이블 CRC가 충분히 싸므로 기본으로 CRC 포함 송신 (False면 AB CD)
+    PIPELINE_MAX   = 4         # 동시에 응답을 기다릴 수 있는 명령 수
 
     def __init__(self, uart_id, tx, rx, baudrate=9600, trigger_pin=None):
+        # timeout=0: StreamReader가 readinto 할 때 '지금 있는 만큼'만 읽고 바로 반환하도록
         self.uart = UART(
             uart_id,
             baudrate=baudrate, bits=8, parity=None, stop=1,
             tx=Pin(tx), rx=Pin(rx),
-            timeout=100, timeout_char=20
+            timeout=0, timeout_char=0
         )
         self.trig = Pin(trigger_pin, Pin.OUT, value=1) if trigger_pin is not None else None
+        self.zones = ZoneShadow(self)  # 존 비트 사본 (설정 변경은 여기에 모아 커밋)
 
-    # ---- CRC-CCITT (0x1021, init 0x0000) per manual; but device also accepts 0xAB,0xCD if CRC check not required ----
-    def _crc_ccitt(self, data: bytes) -> bytes:
-        crc = 0
-        for b in data:
-            crc ^= (b << 8) & 0xFFFF
-            for _ in range(8):
-                if crc & 0x8000:
-                    crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-                else:
-                    crc = (crc << 1) & 0xFFFF
+        # 수신 스트림 상태 (start_reader() 이후 사용)
+        self._rxbuf = bytearray(self.RX_BUF)
+        self._rxmv  = memoryview(self._rxbuf)
+        self._rxn   = 0      # 버퍼에 쌓인 바이트 수
+        self._scan  = 0      # 종단 문자 검색을 이미 마친 위치 (증분 파싱)
+        self._codes = []     # 완성된 바코드 (bytes)
+        self._acks  = []     # 요청과 매칭되지 않은 응답 프레임 (bytes, HDR2로 시작)
+        self._inflight = []  # 응답 대기 중인 _Request (보낸 순서)
+        self._code_ev = asyncio.Event()
+        self._ack_ev  = asyncio.Event()
+        self._rx_task = None
+        self.idle_gap_ms = 40
+        self.raw = False     # True면 이터레이터가 디코드 없이 bytes 반환 (record.parse_into 용)
+        self.rx_dropped = 0  # 버퍼/대기열 넘침으로 버린 횟수
+        self.rx_crc_errors = 0
+
+        # 스캔 지연 측정 (us): 첫 바이트 도착 -> 소비자에게 전달
+        self._t_first = 0
+        self._t_trig = None
+        self.last_latency_us = 0
+        self.max_latency_us = 0
+        self.last_t_first = 0
+        self.last_trigger_latency_us = 0  # 커맨드 모드: 트리거 송신 -> 전달
+
+    # ---- CRC-CCITT (0x1021, init 0x0000) per manual; device also accepts 0xAB,0xCD if CRC check not required ----
+    def _crc_ccitt(self, data) -> bytes:
+        crc = crc_ccitt_fast(data)
         return bytes([(crc >> 8) & 0xFF, crc & 0xFF])
 
-    def _send(self, payload: bytes, use_crc=False, wait_ack=True, ack_timeout_ms=300):
-        crc = self._crc_ccitt(payload) if use_crc else b'\xAB\xCD'
-        pkt = payload + crc
-        self.uart.write(pkt)
-        if not wait_ack:
+    # ---- Command engine: 요청 객체 + 응답 순서 매칭 ----
+    def _submit(self, payload, use_crc, expect_len, timeout_ms, ev=None, nowait=False):
+        if use_crc is None:
+            use_crc = self.USE_CRC
+        # CRC는 헤더(7E 00) 뒤 TYPE부터 계산
+        crc = self._crc_ccitt(memoryview(payload)[2:]) if use_crc else b'\xAB\xCD'
+        req = _Request(expect_len, time.ticks_add(time.ticks_ms(), timeout_ms), ev, nowait)
+        self._expire()
+        self._inflight.append(req)
+        self.uart.write(payload + crc)
+        return req
+
+    def _expire(self):
+        """기한이 지난 요청(응답이 끝내 오지 않은 것, 무대기 송신 포함)을 앞에서부터 버리고 남은 수 반환"""
+        q = self._inflight
+        now = time.ticks_ms()
+        while q and time.ticks_diff(now, q[0].deadline) > 0:
+            q.pop(0)
+        return len(q)
+
+    def _on_ack(self, frame):
+        """응답 프레임을 보낸 순서대로 대기 중인 요청에 매칭 (CRC 틀린 프레임은 버림)"""
+        n = len(frame)
+        if crc_ccitt_fast(memoryview(frame)[2:n - 2]) != (frame[n - 2] << 8) | frame[n - 1]:
+            self.rx_crc_errors += 1
+            return
+        self._expire()
+        q = self._inflight
+        # 앞에서부터 LEN 이 맞는 첫 요청. 그 앞의 무대기 요청은 응답을 잃은 것 -> 버림
+        # (누가 기다리는 요청이 안 맞으면 거기서 멈춤: 응답 순서가 어긋난 것)
+        k = 0
+        while k < len(q):
+            r = q[k]
+            if r.expect_len is None or frame[3] == r.expect_len:
+                del q[:k]
+                req = q.pop(0)
+                req.resp = frame
+                if req.ev is not None:
+                    req.ev.set()
+                return
+            if not r.nowait:
+                break
+            k += 1
+        self._push(self._acks, self.ACK_MAX, frame, self._ack_ev)  # 요청 없는 응답
+
+    async def command_async(self, payload, use_crc=None, expect_len=None, timeout_ms=ACK_TIMEOUT_MS):
+        """명령 송신 후 응답 프레임을 기다림 (이벤트 루프를 막지 않음). 시간 초과 시 None.
+        여러 명령을 gather 로 동시에 보내면 PIPELINE_MAX 까지 응답 대기 없이 연달아 송신"""
+        self.start_reader()
+        while self._expire() >= self.PIPELINE_MAX:
+            await asyncio.sleep_ms(5)
+        req = self._submit(payload, use_crc, expect_len, timeout_ms, asyncio.Event())
+        try:
+            await asyncio.wait_for_ms(req.ev.wait(), timeout_ms)
+        except asyncio.TimeoutError:
+            if req in self._inflight:
+                self._inflight.remove(req)
             return None
+        return req.resp
+
+    def _pump(self):
+        """(블로킹 경로) UART에 지금 있는 바이트를 스트림 파서에 바로 넣음"""
+        if self._rxn >= self.RX_BUF:
+            self._rxn = self._scan = 0
+            self.rx_dropped += 1
+        n = self.uart.readinto(self._rxmv[self._rxn:])
+        if not n:
+            return False
+        if not self._rxn:
+            self._t_first = time.ticks_us()
+        self._rxn += n
+        self._parse()
+        return True
+
+    def _send(self, payload: bytes, use_crc=None, wait_ack=True, ack_timeout_ms=ACK_TIMEOUT_MS, expect_len=None):
+        """블로킹 래퍼: command_async와 같은 요청/매칭 경로를 UART 직접 폴링으로 돌림"""
+        if not wait_ack:
+            self._submit(payload, use_crc, expect_len, min(ack_timeout_ms, self.ACK_WINDOW_MS), nowait=True)
+            return None  # 응답은 나중에 도착하면 이 요청과 매칭되어 버려짐
+        req = self._submit(payload, use_crc, expect_len, ack_timeout_ms)
         t0 = time.ticks_ms()
-        buf = b''
-        while time.ticks_diff(time.ticks_ms(), t0) < ack_timeout_ms:
-            if self.uart.any():
-                buf += self.uart.read()
-                # minimal ack check: look for response header
-                i = buf.find(self.HDR2)
-                if i >= 0 and len(buf) >= i + 4:
-                    return buf
-            time.sleep_ms(5)
-        return buf or None  # may be None if nothing received
+        while req.resp is None and time.ticks_diff(time.ticks_ms(), t0) < ack_timeout_ms:
+            if not self._pump():
+                time.sleep_ms(1)
+        if req.resp is None and req in self._inflight:
+            self._inflight.remove(req)
+        return req.resp
 
     # ---- Zone bit R/W ----
-    def read_zone(self, addr: int, length: int = 1, use_crc=False):
+    def _read_payload(self, addr, length):
         # Input: {HDR1}{TYPE}{LEN}{ADDR_H}{ADDR_L}{COUNT}
-        payload = self.HDR1 + bytes([self.TYPE_READ, 0x01]) + bytes([(addr >> 8) & 0xFF, addr & 0xFF, length & 0xFF])
-        resp = self._send(payload, use_crc=use_crc, wait_ack=True)
-        if not resp:
-            return None
-        i = resp.find(self.HDR2)
-        if i < 0 or len(resp) < i + 4:
-            return None
-        typ = resp[i+2]
-        ln  = resp[i+3]
-        if typ == 0x00 and len(resp) >= i + 4 + ln:
-            return resp[i+4:i+4+ln]
+        return self.HDR1 + bytes([self.TYPE_READ, 0x01, (addr >> 8) & 0xFF, addr & 0xFF, length & 0xFF])
+
+    def _write_payload(self, addr, data_bytes):
+        return self.HDR1 + bytes([self.TYPE_WRITE, len(data_bytes) & 0xFF, (addr >> 8) & 0xFF, addr & 0xFF]) + data_bytes
+
+    def _save_payload(self):
+        return self.HDR1 + bytes([self.TYPE_SAVE, 0x01, 0x00, 0x00, 0x00])
+
+    @staticmethod
+    def ack_ok(resp):
+        """쓰기/저장 응답이 성공(TYPE=00)인지. NAK 나 시간 초과(None)는 False"""
+        return resp is not None and resp[2] == 0x00
+
+    @staticmethod
+    def _zone_data(resp):
+        # Output: {HDR2}{TYPE=00 성공}{LEN}{DATA}
+        if resp and resp[2] == 0x00:
+            return resp[4:4 + resp[3]]
         return None
 
-    def write_zone(self, addr: int, data_bytes: bytes, use_crc=False):
-        ln = len(data_bytes) & 0xFF
-        payload = self.HDR1 + bytes([self.TYPE_WRITE, ln]) + bytes([(addr >> 8) & 0xFF, addr & 0xFF]) + data_bytes
-        return self._send(payload, use_crc=use_crc, wait_ack=True)
+    def read_zone(self, addr: int, length: int = 1, use_crc=None):
+        return self._zone_data(self._send(self._read_payload(addr, length), use_crc=use_crc, expect_len=length))
+
+    def write_zone(self, addr: int, data_bytes: bytes, use_crc=None):
+        return self._send(self._write_payload(addr, data_bytes), use_crc=use_crc, expect_len=1)
 
-    def save_zone_to_flash(self, use_crc=False):
+    def save_zone_to_flash(self, use_crc=None):
         # Save entire zone-bit list (required for persistence)
-        payload = self.HDR1 + bytes([self.TYPE_SAVE, 0x01, 0x00, 0x00, 0x00])
-        return self._send(payload, use_crc=use_crc, wait_ack=True)
+        return self._send(self._save_payload(), use_crc=use_crc, expect_len=1)
+
+    async def read_zone_async(self, addr: int, length: int = 1, use_crc=None):
+        return self._zone_data(await self.command_async(self._read_payload(addr, length), use_crc, expect_len=length))
+
+    async def write_zone_async(self, addr: int, data_bytes: bytes, use_crc=None):
+        return await self.command_async(self._write_payload(addr, data_bytes), use_crc, expect_len=1)
+
+    async def save_zone_to_flash_async(self, use_crc=None):
+        return await self.command_async(self._save_payload(), use_crc, expect_len=1)
 
     # ---- Operating helpers ----
+    ZONE_CONFIG_LEN = 0x14  # 0x0000~0x0013: 모드/트리거/같은 코드 지연을 한 번에 읽는 구간
+
+    def _stage_scan_mode(self, mode, same_code_delay_ms):
+        z = self.zones
+        z.update_bits(self.ZONE_MODE_ADDR, 0x03, mode)
+        if same_code_delay_ms is not None:
+            steps = min(same_code_delay_ms // 100, 0x7F)
+            z.set(self.ZONE_SAME_CODE_ADDR, (0x80 | steps) if steps else 0x00)
+
+    def set_scan_mode(self, mode, same_code_delay_ms=None, persist=True):
+        """스캔 모드(MODE_*) 설정. same_code_delay_ms: 같은 코드를 다시 내보내기 전 장치 쪽 지연
+        (0이면 끔, None이면 그대로, 100ms 단위, 최대 12.7s).
+        설정 구간은 처음 한 번만 읽고, 값이 바뀐 경우에만 쓰고 저장"""
+        if not self.zones.known(self.ZONE_MODE_ADDR):
+            self.zones.load(self.ZONE_MODE_ADDR, self.ZONE_CONFIG_LEN)
+        self._stage_scan_mode(mode, same_code_delay_ms)
+        self.zones.commit(save=persist)
+
+    async def set_scan_mode_async(self, mode, same_code_delay_ms=None, persist=True):
+        if not self.zones.known(self.ZONE_MODE_ADDR):
+            await self.zones.load_async(self.ZONE_MODE_ADDR, self.ZONE_CONFIG_LEN)
+        self._stage_scan_mode(mode, same_code_delay_ms)
+        await self.zones.commit_async(save=persist)
+
     def set_command_trigger_mode(self, persist=True):
-        cur = self.read_zone(self.ZONE_MODE_ADDR) or b'\x00'
-        new = (cur[0] & 0xFC) | 0x01  # bits1-0 = 01 (Command Triggered Mode)
-        if new != cur[0]:
-            self.write_zone(self.ZONE_MODE_ADDR, bytes([new]))
-            if persist:
-                self.save_zone_to_flash()
+        self.set_scan_mode(self.MODE_COMMAND, persist=persist)  # bits1-0 = 01 (Command Triggered Mode)
+
+    async def scan_source(self, mode=MODE_CONTINUOUS, same_code_delay_ms=2000, persist=False, idle_gap_ms=None, raw=False):
+        """연속/감지 모드로 전환하고 바코드 async 이터레이터를 반환 (트리거/폴링 없음).
+            async for code in await scanner.scan_source(): ...
+        모드 설정도 비동기라 다른 태스크(BLE/렌더)를 막지 않음.
+        같은 코드 반복은 장치가 same_code_delay_ms 동안 억제. 지연은 last_latency_us 참고"""
+        await self.set_scan_mode_async(mode, same_code_delay_ms, persist)
+        self.raw = raw
+        self.start_reader(idle_gap_ms)
+        return self
 
     def trigger_once(self):
         # Software trigger = set bit0 of 0x0002 to 1 (auto-reset by device after a successful read)
-        val = self.read_zone(self.ZONE_TRIGGER_ADDR) or b'\x00'
-        self.write_zone(self.ZONE_TRIGGER_ADDR, bytes([val[0] | 0x01]))
+        # 나머지 비트는 사본에서 가져옴 (처음 한 번만 읽음). bit0은 장치가 지우므로 사본엔 남기지 않고 항상 씀
+        if not self.zones.known(self.ZONE_TRIGGER_ADDR):
+            self.zones.load(self.ZONE_TRIGGER_ADDR)
+        val = self.zones.get(self.ZONE_TRIGGER_ADDR) & 0xFE
+        self.write_zone(self.ZONE_TRIGGER_ADDR, bytes([val | 0x01]))
 
     def heartbeat(self):
         # Recommended ~10s 주기로 송신 (응답 없으면 링크 상태 점검) — 포맷은 매뉴얼 표 참고
@@ -131,98 +421,154 @@ class GM805:
                 return s  # raw bytes fallback
             
     async def read_code_async(self, timeout_ms=1500, idle_gap_ms=40):
-        t0 = time.ticks_ms()
-        buf = bytearray()
-        last = time.ticks_ms()
-        while time.ticks_diff(time.ticks_ms(), t0) < timeout_ms:
-            if self.uart.any():
-                b = self.uart.read(1)
-                if b:
-                    buf += b
-                    last = time.ticks_ms()
-                    if b == b'\n':  # CR/LF로 끝나는 형식도 지원
-                        break
-            else:
-                if buf and time.ticks_diff(time.ticks_ms(), last) > idle_gap_ms:
-                    break
-                # ★ 여기서 이벤트 루프에 양보
-                await asyncio.sleep_ms(2)
-        if not buf:
-            return None
-        s = bytes(buf).strip()
-        for enc in ("utf-8", "ascii"):
+        """스트림 수신 태스크가 완성한 다음 바코드를 기다림. 성공 시 str, 시간 초과 시 None"""
+        self.start_reader(idle_gap_ms)
+        if not self._codes:
+            self._code_ev.clear()
             try:
-                return s.decode(enc, "ignore")
-            except:
-                pass
-        return s  # raw bytes fallback
-
-    def trigger_fire_and_forget(self):
-        # ZONE_TRIGGER_ADDR에 0x01 쓰기 패킷을 직접 만들어 ACK 미대기 송신
-        ln = 1
-        payload = (
-            self.HDR1 +
-            bytes([self.TYPE_WRITE, ln]) +
-            bytes([(self.ZONE_TRIGGER_ADDR >> 8) & 0xFF, self.ZONE_TRIGGER_ADDR & 0xFF]) +
-            b'\x01'
-        )
-        self._send(payload, use_crc=False, wait_ack=False)  # ★ ACK 미대기
-
-
-# -------- Example usage --------
-def test_gm_805s():
-    UART_ID = 0   # Pico: UART0=(GP0,GP1), UART1=(GP8,GP9) 등
-    TX_PIN  = 12   # Pico TX -> GM805S RX
-    RX_PIN  = 13   # Pico RX -> GM805S TX
-    scanner = GM805(uart_id=UART_ID, tx=TX_PIN, rx=RX_PIN, baudrate=9600)
-
-    # (선택) 명령 트리거 모드로 전환 후 저장
-    scanner.set_command_trigger_mode(persist=False)
+                await asyncio.wait_for_ms(self._code_ev.wait(), timeout_ms)
+            except asyncio.TimeoutError:
+                return None
+        return self._take_code() if self._codes else None
 
-    print("GM805S ready. Triggering & reading...")
-    while True:
-        # 소프트 트리거 한 번
-        scanner.trigger_once()
+    # ---- Stream reader: UART를 StreamReader로 읽어 바코드/응답 프레임으로 분리 ----
+    def start_reader(self, idle_gap_ms=None):
+        """수신 태스크 시작 (이미 돌고 있으면 idle_gap만 갱신)"""
+        if idle_gap_ms is not None:
+            self.idle_gap_ms = idle_gap_ms
+        if self._rx_task is None:
+            self._rx_task = asyncio.create_task(self._rx_loop())
 
-        # 바코드 수신 대기
-        code = scanner.read_code(timeout_ms=2000)
-        if code:
-            print("BARCODE:", code)
-        else:
-            print("No read")
-        time.sleep(2)
+    async def _rx_loop(self):
+        sr = asyncio.StreamReader(self.uart)
+        while True:
+            if self._rxn >= self.RX_BUF:
+                # 종단 없이 버퍼가 가득 참: 쌓인 것을 버리고 다시 시작
+                self._rxn = self._scan = 0
+                self.rx_dropped += 1
+            mv = self._rxmv[self._rxn:]
+            try:
+                if self._rxn:
+                    # 데이터가 쌓여 있으면 idle gap 동안만 다음 바이트를 기다림
+                    n = await asyncio.wait_for_ms(sr.readinto(mv), self.idle_gap_ms)
+                else:
+                    n = await sr.readinto(mv)
+            except asyncio.TimeoutError:
+                self._parse(flush=True)  # idle gap 종단
+                continue
+            if n:
+                if not self._rxn:
+                    self._t_first = time.ticks_us()
+                self._rxn += n
+                had = self._rxn
+                self._parse()
+                if self._rxn and self._rxn != had:
+                    self._t_first = time.ticks_us()  # 코드를 꺼내고 남은 바이트 = 다음 코드의 시작
 
-async def main_pico():
-    # 핀은 동기 테스트와 동일
-    UART_ID = 0     # Pico: UART0=(GP0,GP1)
-    TX_PIN  = 12    # Pico TX -> GM805S RX
-    RX_PIN  = 13    # Pico RX -> GM805S TX
+    def _parse(self, flush=False):
+        """버퍼에서 완성된 응답 프레임/바코드를 꺼냄. flush=True면 남은 바이트도 바코드로 확정"""
+        buf = self._rxbuf
+        n = self._rxn
+        i = 0
+        while i < n:
+            # 응답 프레임: 02 00 TYPE LEN DATA(LEN) CRC(2)
+            if buf[i] == 0x02 and (i + 1 >= n or buf[i+1] == 0x00):
+                if n - i >= 4 and n - i >= 6 + buf[i+3]:
+                    end = i + 6 + buf[i+3]
+                    self._on_ack(bytes(buf[i:end]))
+                    i = end
+                    self._scan = i
+                    continue
+                if flush:
+                    i = n  # 잘린 응답 프레임은 버림
+                    self.rx_dropped += 1
+                break
+            # 바코드: CR/LF 종단 (이미 검사한 부분은 건너뜀)
+            j = max(i, self._scan)
+            while j < n and buf[j] != 0x0A and buf[j] != 0x0D:
+                j += 1
+            if j < n:
+                if j > i:
+                    self._push(self._codes, self.CODE_MAX, (bytes(buf[i:j]), self._t_first), self._code_ev)
+                i = j + 1
+                self._scan = i
+                continue
+            self._scan = n
+            if flush:
+                self._push(self._codes, self.CODE_MAX, (bytes(buf[i:n]), self._t_first), self._code_ev)
+                i = n
+            break
+        # 처리한 바이트만큼 앞으로 당김
+        if i:
+            rem = n - i
+            if rem:
+                self._rxmv[0:rem] = self._rxmv[i:n]
+            self._rxn = rem
+            self._scan = max(self._scan - i, 0)
 
-    scanner = GM805(uart_id=UART_ID, tx=TX_PIN, rx=RX_PIN, baudrate=9600)
+    def _push(self, q, qmax, item, ev):
+        if len(q) >= qmax:
+            q.pop(0)  # 오래된 것 드롭
+            self.rx_dropped += 1
+        q.append(item)
+        ev.set()
 
-    # (선택) 커맨드 트리거 모드로 전환 (영구 저장은 False)
-    scanner.set_command_trigger_mode(persist=False)
+    def _take_code(self):
+        """대기열에서 바코드 하나를 꺼내 지연을 기록하고 str로 (raw면 bytes 그대로) 반환"""
+        b, t_first = self._codes.pop(0)
+        now = time.ticks_us()
+        self.last_latency_us = time.ticks_diff(now, t_first)
+        self.last_t_first = t_first   # 도착 시각 (끝단 지연 추적용)
+        tracing.add(tracing.ST_UART, self.last_latency_us)
+        if self.last_latency_us > self.max_latency_us:
+            self.max_latency_us = self.last_latency_us
+        if self._t_trig is not None:
+            self.last_trigger_latency_us = time.ticks_diff(now, self._t_trig)
+            self._t_trig = None
+        return b if self.raw else self._decode(b)
 
-    print("GM805S async test. Triggering & awaiting reads...")
-    while True:
-        # ★ 비블로킹 트리거: ACK 미대기(fire-and-forget)
-        scanner.trigger_fire_and_forget()
-        # 트리거 스파밍 방지 약간의 간격
-        await asyncio.sleep_ms(50)
+    @staticmethod
+    def _decode(b):
+        s = b.strip()
+        try:
+            return s.decode("utf-8", "ignore")
+        except:
+            return s  # raw bytes fallback
 
-        # ★ 비동기 수신
-        code = await scanner.read_code_async(timeout_ms=2000, idle_gap_ms=40)
+    async def read_ack_async(self, timeout_ms=300):
+        """요청과 매칭되지 않고 들어온 다음 응답(HDR2) 프레임. 시간 초과 시 None"""
+        self.start_reader()
+        if not self._acks:
+            self._ack_ev.clear()
+            try:
+                await asyncio.wait_for_ms(self._ack_ev.wait(), timeout_ms)
+            except asyncio.TimeoutError:
+                return None
+        return self._acks.pop(0) if self._acks else None
 
-        if code:
-            print("BARCODE:", code)
-        else:
-            print("No read")
+    def codes(self, raw=False):
+        """async for code in scanner.codes(): 바코드가 완성되는 즉시 하나씩 반환"""
+        self.raw = raw
+        self.start_reader()
+        return self
 
-        # 다음 트리거 전 쿨다운(환경에 맞게 조정)
-        await asyncio.sleep_ms(2000)
+    def __aiter__(self):
+        return self
 
-if __name__ == "__main__":
-    asyncio.run(main_pico())
-    #test_gm_805s()
-    
+    async def __anext__(self):
+        while not self._codes:
+            self._code_ev.clear()
+            await self._code_ev.wait()
+        return self._take_code()
 
+    def trigger_fire_and_forget(self):
+        # ZONE_TRIGGER_ADDR에 0x01 쓰기 패킷을 직접 만들어 ACK 미대기 송신
+        ln = 1
+        payload = (
+            self.HDR1 +
+            bytes([self.TYPE_WRITE, ln]) +
+            bytes([(self.ZONE_TRIGGER_ADDR >> 8) & 0xFF, self.ZONE_TRIGGER_ADDR & 0xFF]) +
+            b'\x01'
+        )
+        self._t_trig = time.ticks_us()
+        self._send(payload, use_crc=None, wait_ack=False, expect_len=1)  # ★ ACK 미대기
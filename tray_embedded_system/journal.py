@@ -0,0 +1,143 @@
+# journal.py
+# 트레이 상태(패널 배정/카드 색)를 littlefs 에 append-only 로 기록하고
+# 부팅 시 한 번 훑어 복구합니다. 쓰기는 RAM 에 모았다가 한 번에 (플래시 마모/지연 감소),
+# 파일이 커지면 현재 상태 스냅샷으로 compaction.
+import os
+import time
+import micropython
+import uasyncio as asyncio
+
+JOURNAL_PATH     = "tray.log"
+FLUSH_BYTES      = 256     # RAM 버퍼가 이만큼 차면 바로 기록
+FLUSH_MS         = 1000    # 아니면 이 주기로 기록 (리셋 시 잃는 최대 구간)
+COMPACT_BYTES    = 8 * 1024
+REPLAY_BUDGET_MS = 200     # 부팅 시 재생에 쓸 최대 시간
+
+# 레코드: [MAGIC][op][len][payload(len)][sum] - sum 이 안 맞으면 찢긴 꼬리로 보고 거기서 멈춤
+_MAGIC = 0xA5
+
+OP_YELLOW = 1   # 주사기 스캔 -> 패널 배정 (payload: [panel] + "number-name-route")
+OP_GREEN  = 2   # 환자 QR 확인 (payload 동일)
+
+
+@micropython.viper
+def _sum(buf: ptr8, start: int, end: int) -> int:
+    s = 0
+    i = start
+    while i < end:
+        s += buf[i]
+        i += 1
+    return (s & 0xFF) ^ 0xFF
+
+
+class Journal:
+    def __init__(self, path=JOURNAL_PATH, snapshot=None,
+                 flush_bytes=FLUSH_BYTES, compact_bytes=COMPACT_BYTES):
+        self.path = path
+        self.snapshot = snapshot   # () -> [(op, payload), ...] 현재 상태, compaction 용
+        self.compact_bytes = compact_bytes
+        self._buf = bytearray(flush_bytes)
+        self._n = 0
+        self.size = self._file_size()
+        # 통계
+        self.flushes = 0
+        self.compactions = 0
+
+    def _file_size(self):
+        try:
+            return os.stat(self.path)[6]
+        except OSError:
+            return 0
+
+    def append(self, op, payload):
+        """레코드 하나를 RAM 버퍼에 추가 (플래시 기록은 flush 때)"""
+        ln = len(payload)
+        if ln > 255:
+            raise ValueError("record too long")
+        need = ln + 4
+        if self._n + need > len(self._buf):
+            self.flush()
+        if need > len(self._buf):
+            self._write(self._encode(op, payload))
+            return
+        b = self._buf
+        o = self._n
+        b[o] = _MAGIC
+        b[o+1] = op
+        b[o+2] = ln
+        b[o+3:o+3+ln] = payload
+        b[o+3+ln] = _sum(b, o + 1, o + 3 + ln)
+        self._n = o + need
+
+    def _encode(self, op, payload):
+        rec = bytearray(len(payload) + 4)
+        rec[0] = _MAGIC
+        rec[1] = op
+        rec[2] = len(payload)
+        rec[3:3+len(payload)] = payload
+        rec[-1] = _sum(rec, 1, len(rec) - 1)
+        return rec
+
+    def _write(self, data):
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self.size += len(data)
+
+    def flush(self):
+        """버퍼를 한 번의 append 로 기록하고, 커졌으면 compaction"""
+        if self._n:
+            self._write(memoryview(self._buf)[:self._n])
+            self._n = 0
+            self.flushes += 1
+        if self.size > self.compact_bytes and self.snapshot is not None:
+            self.compact(self.snapshot())
+
+    def compact(self, records):
+        """현재 상태만 새 파일에 쓰고 rename 으로 교체 (중간에 꺼져도 이전 파일은 온전)"""
+        self._n = 0
+        tmp = self.path + ".tmp"
+        n = 0
+        with open(tmp, "wb") as f:
+            for op, payload in records:
+                rec = self._encode(op, payload)
+                f.write(rec)
+                n += len(rec)
+        os.rename(tmp, self.path)
+        self.size = n
+        self.compactions += 1
+
+    def replay(self, apply, budget_ms=REPLAY_BUDGET_MS):
+        """로그를 한 번 훑으며 apply(op, payload) 호출. (레코드 수, 끝까지 읽었는지) 반환"""
+        t0 = time.ticks_ms()
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return 0, True
+        with f:
+            data = f.read()
+        count = 0
+        mv = memoryview(data)
+        i = 0
+        n = len(data)
+        while i + 4 <= n:
+            if time.ticks_diff(time.ticks_ms(), t0) > budget_ms:
+                return count, False
+            ln = data[i+2]
+            end = i + 3 + ln
+            if data[i] != _MAGIC or end >= n or data[end] != _sum(data, i + 1, end):
+                break   # 찢긴 꼬리: 여기까지만 유효
+            apply(data[i+1], bytes(mv[i+3:end]))
+            count += 1
+            i = end + 1
+        if i != n:
+            # 유효한 부분만 남겨 다음 append 가 깨진 꼬리 뒤에 붙지 않게 함
+            with open(self.path, "wb") as f:
+                f.write(mv[:i])
+            self.size = i
+        return count, True
+
+    async def run(self, period_ms=FLUSH_MS):
+        """주기적으로 버퍼를 기록하는 태스크"""
+        while True:
+            await asyncio.sleep_ms(period_ms)
+            self.flush()
@@ -1,25 +1,37 @@
 #main.py
+import gc
+import time
+_t_boot = time.ticks_ms()
+_free_boot = gc.mem_free()
 import uasyncio as asyncio
 from micropython import const
 from display_controller import displayController
 from gm_805s import GM805
 from ble_qr_receiver import BLEQRReceiver
+from journal import Journal
+from record import Record, parse_into
+import tracing
 from machine import UART, Pin
-import time
 
+# 모듈 import 에 든 시간/힙 (.py 소스 vs tools/build.py 의 .mpy, frozen 비교용)
+gc.collect()
+print("boot: imports", time.ticks_diff(time.ticks_ms(), _t_boot), "ms, heap",
+      _free_boot - gc.mem_free(), "B, mem_free", gc.mem_free(), "B")
 
-patient_numbers = []
 
 async def consumer(receiver: BLEQRReceiver, display: displayController):
-    global patient_numbers
+    rec = Record()
     while True:
-        msg = await receiver.get_msg()
-        print(msg)
-        info = msg.split('-') # number, name, route
-        
-        if info[0] not in patient_numbers:
-            patient_numbers.append(info[0])
-            display.paint_the_town_green(info)
+        buf = await receiver.get_bytes()
+        t = time.ticks_us()
+        ok = parse_into(rec, buf)  # number, name, route
+        tracing.span(tracing.ST_PARSE, t)
+        if not ok:
+            print("bad record:", rec.error, buf)
+            continue
+        print(rec.fields())
+        # 패널 조회/중복(이미 초록) 판단은 컨트롤러의 슬롯 인덱스에서 O(1)
+        display.paint_the_town_green(rec.fields(), receiver.last_t_irq)
 
 
 async def main_pico():
@@ -28,31 +40,39 @@ async def main_pico():
     UART_ID = 0   # Pico: UART0=(GP0,GP1), UART1=(GP8,GP9) 등
     TX_PIN  = 12   # Pico TX -> GM805S RX
     RX_PIN  = 13  # Pico RX -> GM805S TX
-    full_display = displayController()    
-    scanner = GM805(uart_id=UART_ID, tx=TX_PIN, rx=RX_PIN, baudrate=9600)
+    # BLE 를 먼저 올려 패널 초기화 동안에도 광고/연결이 진행되게 함
     qr_receiver = BLEQRReceiver()
+    journal = Journal()
+    full_display = displayController(journal=journal, start=False)
+    t0 = time.ticks_ms()
+    await full_display.start_async()   # 리셋 + 모든 패널 동시 초기화 + 부팅 화면 (캐시)
+    print("panels up:", time.ticks_diff(time.ticks_ms(), t0), "ms")
+    # 리셋 전 상태 복구 (저널 한 번 재생, 시간 예산 안에서)
+    t0 = time.ticks_ms()
+    n, complete = full_display.restore()
+    print("journal replay:", n, "records,", time.ticks_diff(time.ticks_ms(), t0), "ms", "" if complete else "(budget hit)")
+    scanner = GM805(uart_id=UART_ID, tx=TX_PIN, rx=RX_PIN, baudrate=9600)
+    asyncio.create_task(full_display.run())  # 렌더 태스크 (그리기/전송은 여기서만)
+    asyncio.create_task(journal.run())       # 저널 버퍼 주기 기록
     asyncio.create_task(consumer(qr_receiver, full_display))
+    asyncio.create_task(tracing.run(qr_receiver.publish_stats))  # 단계별 지연 요약 -> BLE stats
     
-    scanner.set_command_trigger_mode(persist=False)
+    # 연속 스캔 모드: 트리거/대기 없이 읽히는 즉시 코드가 들어옴 (같은 코드는 장치가 2초간 억제)
+    codes = await scanner.scan_source(GM805.MODE_CONTINUOUS, same_code_delay_ms=2000, raw=True)
+    rec = Record()
 
-    print("GM805S async test. Triggering & awaiting reads...")
-    while True:
-        scanner.trigger_fire_and_forget()
-        await asyncio.sleep_ms(50)
-
-        code = await scanner.read_code_async(timeout_ms=2000, idle_gap_ms=40)
-        code[:-1]
-        if code:
-            split_code = code.split('-')
-            if len(split_code) > 2 and last_patient != split_code[0]:
-                split_code[2] = split_code[2][0:2]
-                print(split_code)
-                last_patient = split_code[0]
-                full_display.paint_the_town_yellow(split_code)
-        else:
-            print("No read")
-
-        await asyncio.sleep_ms(2000)
+    print("GM805S continuous scan. Awaiting reads...")
+    async for code in codes:
+        t = time.ticks_us()
+        ok = parse_into(rec, code)
+        tracing.span(tracing.ST_PARSE, t)
+        if not ok:
+            print("bad code:", rec.error, code)
+            continue
+        if last_patient != rec.number:
+            print(rec.fields())
+            last_patient = rec.number
+            full_display.paint_the_town_yellow(rec.fields(), scanner.last_t_first)
     
 if __name__ == "__main__":
     asyncio.run(main_pico())
@@ -0,0 +1,104 @@
+# record.py
+# QR 레코드 "number-name-route" 공용 코덱. BLE 수신(bytes)과 스캐너(bytes) 양쪽에서
+# split 없이 구분자 위치만 찾아 미리 만든 Record 에 채우고, 스키마를 검사합니다.
+import micropython
+
+SEP        = 0x2D   # '-'
+NUMBER_MAX = 16     # 환자 번호 최대 바이트
+NAME_MAX   = 32     # 이름 최대 바이트 (UTF-8)
+ROUTE_LEN  = 2      # route 는 앞 2글자만 사용 (예: "SC")
+
+
+@micropython.viper
+def _find(buf: ptr8, start: int, end: int, ch: int) -> int:
+    i = start
+    while i < end:
+        if buf[i] == ch:
+            return i
+        i += 1
+    return -1
+
+
+@micropython.viper
+def _rstrip(buf: ptr8, start: int, end: int) -> int:
+    # 끝의 공백/CR/LF/NUL 제거 후 새 end
+    while end > start and buf[end - 1] <= 0x20:
+        end -= 1
+    return end
+
+
+@micropython.viper
+def _lstrip(buf: ptr8, start: int, end: int) -> int:
+    # 앞의 공백 제거 후 새 start (이전 구현의 .strip() 과 같게)
+    while start < end and buf[start] <= 0x20:
+        start += 1
+    return start
+
+
+@micropython.viper
+def _chars_end(buf: ptr8, start: int, end: int, n: int) -> int:
+    # start 부터 UTF-8 문자 n 개가 끝나는 위치, 문자가 모자라면 -1 (문자 중간에서 자르지 않음)
+    i = start
+    while n > 0:
+        if i >= end:
+            return -1
+        i += 1
+        while i < end and (buf[i] & 0xC0) == 0x80:   # 이어지는 바이트
+            i += 1
+        n -= 1
+    return i
+
+
+class Record:
+    """파싱 결과를 담는 재사용 객체. parse_into() 가 실패하면 error 에 이유"""
+    __slots__ = ("number", "name", "route", "error")
+
+    def __init__(self):
+        self.number = ""
+        self.name = ""
+        self.route = ""
+        self.error = None
+
+    def fields(self):
+        """(number, name, route) - 디스플레이/저널에 넘길 불변 튜플"""
+        return (self.number, self.name, self.route)
+
+
+def parse_into(rec, buf):
+    """bytes/bytearray/memoryview 를 rec 에 채움. 스키마에 맞으면 True"""
+    mv = memoryview(buf)
+    end = _rstrip(buf, 0, len(buf))
+    s = _lstrip(buf, 0, end)
+    a = _find(buf, s, end, SEP)
+    b = _find(buf, a + 1, end, SEP) if a >= 0 else -1
+    if b < 0:
+        rec.error = "fields"
+        return False
+    c = _find(buf, b + 1, end, SEP)
+    if c < 0:
+        c = end
+    if not 0 < a - s <= NUMBER_MAX:
+        rec.error = "number"
+        return False
+    if not 0 < b - a - 1 <= NAME_MAX:
+        rec.error = "name"
+        return False
+    r = _chars_end(buf, b + 1, c, ROUTE_LEN)   # route 는 앞 ROUTE_LEN 글자
+    if r < 0:
+        rec.error = "route"
+        return False
+    try:
+        rec.number = str(mv[s:a], "utf-8")
+        rec.name = str(mv[a + 1:b], "utf-8")
+        rec.route = str(mv[b + 1:r], "utf-8")
+    except ValueError:   # UnicodeError
+        rec.error = "utf-8"
+        return False
+    rec.error = None
+    return True
+
+
+def parse(buf):
+    """새 Record 반환, 스키마에 맞지 않으면 None"""
+    rec = Record()
+    return rec if parse_into(rec, buf) else None
@@ -0,0 +1,66 @@
+# slot_allocator.py
+# 환자 번호 -> 패널 슬롯 배정. 크기가 패널 수로 고정된 dict 인덱스라
+# 근무 시간 내내 메모리가 늘지 않고, 조회는 O(1).
+
+
+class SlotAllocator:
+    """키(환자 번호) -> 슬롯 번호(0..n-1). 빈 슬롯이 없으면 가장 오래 전에 배정된 슬롯을 재사용(LRU)"""
+    def __init__(self, n):
+        self.n = n
+        self._slot = {}            # key -> slot (최대 n개)
+        self._keys = [None] * n    # slot -> key
+        self._stamp = [0] * n      # 마지막 배정 순번 (LRU 선택용)
+        self._clock = 0
+
+    def __len__(self):
+        return len(self._slot)
+
+    def lookup(self, key):
+        """배정된 슬롯 번호, 없으면 None"""
+        return self._slot.get(key)
+
+    def key(self, i):
+        return self._keys[i]
+
+    def assign(self, key):
+        """key 의 슬롯을 반환. 처음 보는 key 면 빈 슬롯 또는 LRU 슬롯을 빼앗아 배정"""
+        i = self._slot.get(key)
+        return self.place(key, self._victim() if i is None else i)
+
+    def place(self, key, i):
+        """key 를 슬롯 i 에 직접 배정 (저널 복구용). 그 슬롯의 이전 key 는 빠짐"""
+        cur = self._slot.get(key)
+        if cur is not None and cur != i:
+            self._keys[cur] = None
+            self._stamp[cur] = 0
+        old = self._keys[i]
+        if old is not None and old != key:
+            del self._slot[old]
+        self._keys[i] = key
+        self._slot[key] = i
+        self._clock += 1
+        self._stamp[i] = self._clock
+        return i
+
+    def order(self):
+        """배정된 슬롯들을 오래된 것부터 (같은 순서로 assign 하면 같은 배정이 재현됨)"""
+        used = [i for i in range(self.n) if self._keys[i] is not None]
+        used.sort(key=lambda i: self._stamp[i])
+        return used
+
+    def release(self, key):
+        """key 의 배정을 풀어 다음 assign 에서 먼저 쓰이게 함"""
+        i = self._slot.pop(key, None)
+        if i is not None:
+            self._keys[i] = None
+            self._stamp[i] = 0
+        return i
+
+    def _victim(self):
+        # 빈 슬롯 우선(stamp 0), 없으면 stamp 가 가장 작은(가장 오래된) 슬롯
+        # 모두 차 있으면 배정 순서대로 돌아가므로 기존 CURRENT 라운드로빈과 같음
+        best = 0
+        for i in range(1, self.n):
+            if self._stamp[i] < self._stamp[best]:
+                best = i
+        return best
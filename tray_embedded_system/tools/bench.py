@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# bench.py (호스트용: CPython 또는 MicroPython unix 포트)
+# 하드웨어 없이 tools/sim 대역 위에서 펌웨어 핫패스 시간을 잽니다. tray_embedded_system 에서:
+#   python3 tools/bench.py [-n 200] [--save base.json] [--check base.json]
+# --check: 저장한 기준과 비교해 시간은 TIME_TOL 넘게 느려지거나, SPI 바이트가 늘면 종료 코드 1.
+# SPI 선로 시간(wire_us)은 보레이트 모델 값이라 호스트 속도와 무관하게 결정적입니다.
+import sys
+sys.path.insert(0, "tools/sim")
+import host
+host.install()
+
+import json
+import time
+import uasyncio as asyncio
+from machine import SPI
+
+import assets
+import display
+from display import SPIBus, ST7735, PIN_DC, PIN_RST, WIDTH, HEIGHT, RED, BLACK
+from display_controller import displayController, panel_array, LOGO
+from gm_805s import GM805, crc_ccitt
+from record import Record, parse_into
+from gm805_device import GM805Device, MODE_CONTINUOUS
+from ble_qr_receiver import BLEQRReceiver
+import tracing
+
+SPI_BAUD = 20_000_000
+TIME_TOL = 0.25
+CODE     = "123456-홍길동-SC"
+
+results = {}
+
+
+def record(name, us, nbytes=None, wire_us=None):
+    results[name] = {"us": us, "bytes": nbytes, "wire_us": wire_us}
+    extra = ""
+    if nbytes is not None:
+        extra = "  spi %7d B  wire %7d us" % (nbytes, wire_us)
+    print("%-22s %10.1f us/op%s" % (name, us, extra))
+
+
+def timeit(fn, n):
+    t0 = time.ticks_us()
+    for _ in range(n):
+        fn()
+    return time.ticks_diff(time.ticks_us(), t0) / n
+
+
+def _panel():
+    spi = SPI(0, baudrate=SPI_BAUD)
+    tft = ST7735(SPIBus(spi, PIN_DC), cs=[7], dc=PIN_DC, rst=PIN_RST, width=WIDTH, height=HEIGHT)
+    tft.set_rotation(1)
+    return tft, spi
+
+
+def bench_show(n):
+    tft, spi = _panel()
+    tft.fill(RED)
+    spi.reset_stats()
+    us = timeit(lambda: tft.show(full=True), n)
+    record("show(full)", us, spi.nbytes // n, spi.wire_us // n)
+
+    def partial():
+        tft.text("123456", 80, 20, BLACK)
+        tft.show()
+    spi.reset_stats()
+    us = timeit(partial, n)
+    record("show(text field)", us, spi.nbytes // n, spi.wire_us // n)
+
+
+def bench_bmp(n):
+    tft, _ = _panel()
+    us = timeit(lambda: assets.decode_bmp24(LOGO, (255, 255, 255)), max(n // 20, 1))
+    record("bmp24 decode", us)
+
+    def cold():
+        assets._cache.clear()
+        tft.draw_bmp24(LOGO, 10, 10, (255, 255, 255))
+    record("draw_bmp24 (cold)", timeit(cold, max(n // 10, 1)))
+    record("draw_bmp24 (cached)", timeit(lambda: tft.draw_bmp24(LOGO, 10, 10, (255, 255, 255)), n))
+
+
+def bench_text_scaled(n):
+    tft, _ = _panel()
+
+    def cold():
+        display._glyphs.clear()
+        tft.text_scaled("SC", 65, 75, BLACK, scale=5)
+    record("text_scaled (cold)", timeit(cold, max(n // 10, 1)))
+    record("text_scaled (cached)", timeit(lambda: tft.text_scaled("SC", 65, 75, BLACK, scale=5), n))
+
+
+def bench_crc(n):
+    scanner = GM805(uart_id=0, tx=12, rx=13)
+    pkt = b'\x08\x01\x00\x02\x01'
+    record("crc table", timeit(lambda: crc_ccitt(pkt), n))
+    record("_crc_ccitt", timeit(lambda: scanner._crc_ccitt(pkt), n))
+
+
+def bench_record(n):
+    rec = Record()
+    raw = (CODE + "\r\n").encode()
+    record("record parse_into", timeit(lambda: parse_into(rec, raw), n))
+
+
+async def bench_read_code(n):
+    scanner = GM805(uart_id=0, tx=12, rx=13)
+    dev = GM805Device(scanner.uart)
+    dev.zones[0] = MODE_CONTINUOUS
+    total = 0
+    for k in range(n):
+        t0 = time.ticks_us()
+        dev.scan("%d-Kim-SC" % k)
+        code = await scanner.read_code_async(timeout_ms=100)
+        total += time.ticks_diff(time.ticks_us(), t0)
+        assert code == "%d-Kim-SC" % k, code
+    record("read_code_async", total / n)
+
+
+async def bench_ble_ingest(n):
+    """묶음 characteristic 으로 레코드 n 개를 MTU 크기 Write 로 밀어 넣고 모두 꺼내기까지"""
+    r = BLEQRReceiver(inbox_max=n)
+    ble = r._ble
+    ble.connect(1)
+    rec = CODE.encode()
+    stream = b"".join(bytes((len(rec),)) + rec for _ in range(n))
+    mtu = ble.config("mtu") - 3
+    t0 = time.ticks_us()
+    for o in range(0, len(stream), mtu):
+        ble.write(1, r._bulk_handle, stream[o:o + mtu])
+    for _ in range(n):
+        await r.get_bytes()
+    record("ble bulk ingest", time.ticks_diff(time.ticks_us(), t0) / n)
+
+
+async def bench_scan_to_paint(n):
+    """스캐너 바코드 도착 -> 레코드 파싱 -> 패널 렌더/전송 완료까지 (main.py 의 경로)"""
+    ctl = displayController()
+    spi = ctl.tft_list[0].spi
+    scanner = GM805(uart_id=0, tx=12, rx=13)
+    dev = GM805Device(scanner.uart)
+    codes = await scanner.scan_source(GM805.MODE_CONTINUOUS, same_code_delay_ms=2000, raw=True)
+
+    done = asyncio.Event()
+    render = ctl._render
+
+    async def traced(*args):
+        await render(*args)
+        done.set()
+    ctl._render = traced
+    asyncio.create_task(ctl.run())
+
+    rec = Record()
+    total = nbytes = wire = 0
+    for k in range(n):
+        spi.reset_stats()
+        done.clear()
+        t0 = time.ticks_us()
+        dev.scan("%d-홍길동-SC" % (1000 + k))
+        code = await codes.__anext__()
+        parse_into(rec, code)
+        ctl.paint_the_town_yellow(rec.fields(), scanner.last_t_first)
+        await done.wait()
+        total += time.ticks_diff(time.ticks_us(), t0)
+        nbytes += spi.nbytes
+        wire += spi.wire_us
+    record("scan->paint", total / n, nbytes // n, wire // n)
+
+
+async def bench_panels(k, banded, n):
+    """패널 k 개 전부를 새 환자로 다시 배정/렌더/전송하는 한 바퀴 (패널 수에 선형이어야 함)"""
+    ctl = displayController(banded=banded, panels=panel_array(k))
+    spi = ctl.tft_list[0].spi
+    left = [0]
+    done = asyncio.Event()
+    render = ctl._render
+
+    async def traced(*args):
+        await render(*args)
+        left[0] -= 1
+        if not left[0]:
+            done.set()
+    ctl._render = traced
+    asyncio.create_task(ctl.run())
+
+    total = nbytes = wire = 0
+    for r in range(n):
+        spi.reset_stats()
+        done.clear()
+        left[0] = k
+        t0 = time.ticks_us()
+        for j in range(k):
+            ctl.paint_the_town_yellow(("%d" % (1000 + r * k + j), "홍길동", "SC"))
+        await done.wait()
+        total += time.ticks_diff(time.ticks_us(), t0)
+        nbytes += spi.nbytes
+        wire += spi.wire_us
+    name = "repaint x%d%s" % (k, " banded" if ctl.banded else "")
+    record(name, total / n, nbytes // n, wire // n)
+    ram = sum(len(t.buffer) for t in ctl.tft_list if t.buffer is not None)
+    if ctl._strip is not None:
+        ram += len(ctl._strip.buffer)
+    print("%-22s %10d B display buffers" % ("", ram))
+
+
+def check(path):
+    with open(path) as f:
+        base = json.load(f)
+    bad = 0
+    for name, r in results.items():
+        b = base.get(name)
+        if b is None:
+            continue
+        if r["us"] > b["us"] * (1 + TIME_TOL):
+            print("REGRESSION %s: %.1f us > %.1f us" % (name, r["us"], b["us"]))
+            bad += 1
+        if b["bytes"] is not None and r["bytes"] > b["bytes"]:
+            print("REGRESSION %s: %d B > %d B" % (name, r["bytes"], b["bytes"]))
+            bad += 1
+    return bad
+
+
+def main(argv):
+    n = 200
+    save = chk = None
+    i = 0
+    while i < len(argv):
+        if argv[i] == "-n":
+            n = int(argv[i + 1]); i += 1
+        elif argv[i] == "--save":
+            save = argv[i + 1]; i += 1
+        elif argv[i] == "--check":
+            chk = argv[i + 1]; i += 1
+        i += 1
+
+    bench_show(max(n // 20, 1))
+    bench_bmp(n)
+    bench_text_scaled(n)
+    bench_crc(n * 10)
+    bench_record(n * 10)
+    asyncio.run(bench_read_code(n))
+    asyncio.run(bench_ble_ingest(min(n, 64)))
+    for k, banded in ((4, None), (4, True), (8, None)):
+        asyncio.run(bench_panels(k, banded, max(n // 40, 1)))
+    tracing.reset()
+    asyncio.run(bench_scan_to_paint(max(n // 20, 1)))
+    print(tracing.report())
+
+    if save:
+        with open(save, "w") as f:
+            json.dump(results, f)
+    if chk and check(chk):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# bmp2bin.py (호스트용, CPython)
+# 24비트 BMP를 트레이가 바로 blit 할 수 있는 스프라이트 .bin 으로 변환합니다.
+#   python3 tools/bmp2bin.py image_50_medium.bmp --key 255,255,255
+# 출력 포맷 (assets.load_bin 과 동일):
+#   헤더 "<2sHHi" = b"SP", width, height, key(-1 = 투명색 없음)
+#   본문 width*height 개의 RGB565 픽셀 (패널 바이트 순서, framebuf 저장 형식)
+import argparse
+import struct
+
+BIN_MAGIC  = b"SP"
+BIN_HEADER = "<2sHHi"
+
+
+def panel565(r, g, b):
+    """RGB888 -> 패널 바이트 순서(스왑된) RGB565 (assets._panel565 와 동일)"""
+    return (((g & 0x1C) << 11) | ((b & 0xF8) << 5)) | ((r & 0xF8) | (g >> 5))
+
+
+def convert(src, colkey=None):
+    with open(src, "rb") as f:
+        data = f.read()
+    if data[0:2] != b"BM":
+        raise ValueError("Not a BMP")
+    pixel_offset = struct.unpack_from("<I", data, 10)[0]
+    dib, width, height, _planes, bpp, comp = struct.unpack_from("<IiiHHI", data, 14)
+    if dib < 40:
+        raise ValueError("Unsupported DIB header")
+    if bpp != 24 or comp != 0:
+        raise ValueError("Need 24-bit uncompressed BMP")
+
+    top_down = height < 0
+    height = abs(height)
+    key = -1 if colkey is None else panel565(*colkey)
+
+    out = bytearray(width * height * 2)
+    row_bytes = ((width * 3 + 3) // 4) * 4
+    for row in range(height):
+        line = data[pixel_offset + row * row_bytes:]
+        dst_y = row if top_down else (height - 1 - row)
+        for x in range(width):
+            b, g, r = line[x * 3:x * 3 + 3]
+            if key >= 0 and (r, g, b) == colkey:
+                c = key
+            else:
+                c = panel565(r, g, b)
+                if c == key:
+                    c ^= 0x0100  # 투명 키와 겹치면 파랑 LSB만 바꿔 구분
+            struct.pack_into("<H", out, (dst_y * width + x) * 2, c)
+    return struct.pack(BIN_HEADER, BIN_MAGIC, width, height, key) + out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="24-bit BMP -> ready-to-blit RGB565 sprite (.bin)")
+    ap.add_argument("src")
+    ap.add_argument("dst", nargs="?", help="기본값: src 와 같은 이름의 .bin")
+    ap.add_argument("--key", help="투명색 r,g,b (예: 255,255,255)")
+    args = ap.parse_args()
+
+    colkey = tuple(int(v) for v in args.key.split(",")) if args.key else None
+    dst = args.dst or args.src.rsplit(".", 1)[0] + ".bin"
+    blob = convert(args.src, colkey)
+    with open(dst, "wb") as f:
+        f.write(blob)
+    print("%s -> %s (%d bytes)" % (args.src, dst, len(blob)))
+
+
+if __name__ == "__main__":
+    main()
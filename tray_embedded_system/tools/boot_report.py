@@ -0,0 +1,44 @@
+# boot_report.py (보드에서 실행: mpremote run tools/boot_report.py)
+# main.py 가 쓰는 모듈을 차례로 import 하며 모듈별 import 시간과 힙 사용량을 출력합니다.
+# .py 소스로 올렸을 때와 tools/build.py 로 만든 .mpy 를 올렸을 때를 비교하는 용도.
+# 호스트에서도 돌아감 (tools/sim 대역 사용, 힙 수치는 0): python3 tools/boot_report.py
+import sys
+import gc
+import time
+
+if sys.implementation.name != "micropython" or not hasattr(gc, "mem_free"):
+    sys.path.insert(0, __file__.rsplit("/", 1)[0] + "/sim")
+    import host
+    host.install()
+
+# tools/build.py 의 MODULES 와 같게 유지
+MODULES = [
+    "tracing", "record", "slot_allocator", "journal", "assets", "display",
+    "display_controller", "gm_805s", "ble_advertising", "ble_qr_receiver",
+]
+
+
+def _free():
+    gc.collect()
+    return gc.mem_free() if hasattr(gc, "mem_free") else 0
+
+
+def report():
+    free0 = _free()
+    total = 0
+    print("%-20s %9s %9s" % ("module", "ms", "heap B"))
+    for m in MODULES:
+        if m in sys.modules:
+            continue
+        before = _free()
+        t0 = time.ticks_us()
+        __import__(m)
+        dt = time.ticks_diff(time.ticks_us(), t0)
+        total += dt
+        print("%-20s %9.1f %9d" % (m, dt / 1000, before - _free()))
+    free1 = _free()
+    print("%-20s %9.1f %9d" % ("total", total / 1000, free0 - free1))
+    print("mem_free before %d after %d" % (free0, free1))
+
+
+report()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# build.py (호스트용, CPython)
+# 펌웨어 모듈을 mpy-cross 로 미리 컴파일해 build/ 에 보드에 그대로 올릴 트리를 만듭니다.
+# 보드는 부팅 때 .py 를 컴파일하지 않아도 되고(시간), 컴파일러가 쓰는 힙도 아낌.
+#   pip install mpy-cross mpremote
+#   python3 tools/build.py                    # build/ 생성
+#   python3 tools/build.py --deploy --report  # 보드에 올리고, 올리기 전/후 import 시간·힙 비교
+# main.py 는 보드가 소스로만 실행하므로 그대로 복사 (얇게 유지).
+# 펌웨어에 아예 넣으려면(frozen, 바이트코드가 플래시에서 바로 실행 -> 힙 거의 0) tools/manifest.py 참고.
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+# main.py 가 import 하는 순서대로 (boot_report.py 의 MODULES 와 같게 유지)
+MODULES = [
+    "tracing", "record", "slot_allocator", "journal", "assets", "display",
+    "display_controller", "gm_805s", "ble_advertising", "ble_qr_receiver",
+]
+DATA  = ["main.py", "image_50_medium.bin", "image_50_medium.bmp"]
+MARCH = "armv6m"   # RP2040 (Cortex-M0+). viper/native 코드는 아키텍처 지정이 필요
+
+
+def mpy_cross(args):
+    exe = shutil.which("mpy-cross")
+    cmd = [exe] if exe else [sys.executable, "-m", "mpy_cross"]
+    subprocess.run(cmd + args, check=True)
+
+
+def build(src, out, march=MARCH, opt=1):
+    os.makedirs(out, exist_ok=True)
+    total_src = total_mpy = 0
+    for m in MODULES:
+        py = os.path.join(src, m + ".py")
+        mpy = os.path.join(out, m + ".mpy")
+        mpy_cross(["-march=" + march, "-O%d" % opt, "-o", mpy, py])
+        a, b = os.path.getsize(py), os.path.getsize(mpy)
+        total_src += a
+        total_mpy += b
+        print("%-22s %7d B -> %6d B" % (m, a, b))
+    for name in DATA:
+        shutil.copy(os.path.join(src, name), out)
+    print("%-22s %7d B -> %6d B" % ("total", total_src, total_mpy))
+
+
+def mpremote(*args, check=True):
+    return subprocess.run(["mpremote"] + list(args), check=check)
+
+
+def deploy(out):
+    """build/ 를 보드 루트에 올리고, 같은 이름의 .py 를 지움 (.py 가 있으면 .mpy 보다 먼저 import 됨)"""
+    for m in MODULES:
+        mpremote("rm", ":" + m + ".py", check=False)
+    files = [os.path.join(out, f) for f in sorted(os.listdir(out))]
+    mpremote("cp", *files, ":")
+
+
+def report(tools):
+    mpremote("run", os.path.join(tools, "boot_report.py"))
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    src = os.path.dirname(here)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=os.path.join(src, "build"))
+    ap.add_argument("--march", default=MARCH)
+    ap.add_argument("-O", dest="opt", type=int, default=1, help="mpy-cross 최적화 단계 (1: assert 제거)")
+    ap.add_argument("--deploy", action="store_true", help="mpremote 로 보드에 올림")
+    ap.add_argument("--report", action="store_true", help="올리기 전/후 boot_report 실행")
+    a = ap.parse_args()
+
+    build(src, a.out, a.march, a.opt)
+    if a.report:
+        print("-- before")
+        report(here)
+    if a.deploy:
+        deploy(a.out)
+    if a.report:
+        print("-- after")
+        report(here)
+
+
+if __name__ == "__main__":
+    main()
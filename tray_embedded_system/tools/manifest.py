@@ -0,0 +1,14 @@
+# manifest.py
+# 트레이 모듈을 펌웨어 이미지에 frozen 으로 넣는 빌드 manifest (MicroPython 소스 트리에서 빌드).
+# frozen 모듈은 바이트코드가 플래시에서 바로 실행되어 import 시 힙을 거의 쓰지 않음.
+#   cd micropython/ports/rp2
+#   make BOARD=RPI_PICO_W FROZEN_MANIFEST=<repo>/tray_embedded_system/tools/manifest.py
+# main.py 와 데이터 파일(로고)은 frozen 대상이 아님 -> 보드 파일시스템에 따로 올림.
+# 보드에 같은 이름의 .py/.mpy 가 남아 있으면 그쪽이 먼저 import 되므로 지울 것.
+include("$(BOARD_DIR)/manifest.py")   # Pico W 기본 (network, bluetooth, uasyncio 등)
+
+for m in (
+    "tracing", "record", "slot_allocator", "journal", "assets", "display",
+    "display_controller", "gm_805s", "ble_advertising", "ble_qr_receiver",
+):
+    module(m + ".py", base_path="..", opt=1)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# selftest.py (호스트용: CPython 또는 MicroPython unix 포트)
+# 하드웨어 없이 tools/sim 대역 위에서 펌웨어 동작을 확인합니다. tray_embedded_system 에서:
+#   python3 tools/selftest.py
+# 실패가 하나라도 있으면 종료 코드 1.
+import sys
+sys.path.insert(0, "tools/sim")
+import host
+host.install()
+
+import time
+import uasyncio as asyncio
+
+from gm_805s import GM805
+from gm805_device import GM805Device
+from ble_qr_receiver import BLEQRReceiver, SLOT_SIZE
+from record import parse
+import tracing
+
+failed = []
+
+
+def check(name, cond, detail=""):
+    print("%-4s %s %s" % ("ok" if cond else "FAIL", name, detail))
+    if not cond:
+        failed.append(name)
+
+
+# ---- GM805 명령 엔진 ----
+async def lost_ack(expect_len):
+    """무대기 트리거의 ACK 를 잃은 뒤 다음 존 읽기가 바로 응답을 받는지"""
+    scanner = GM805(uart_id=0, tx=12, rx=13)
+    dev = GM805Device(scanner.uart)
+    dev.zones[0] = 0x5A
+    dev.zones[1] = 0xA5
+    scanner.uart.device = None           # 트리거가 장치에 닿지 않음 -> ACK 없음
+    scanner.trigger_fire_and_forget()
+    scanner.uart.device = dev
+    if expect_len == 1:
+        # LEN 이 같으면 응답만으로는 구분할 수 없음 -> ACK 창이 지난 뒤의 읽기
+        await asyncio.sleep_ms(GM805.ACK_WINDOW_MS + 10)
+    t0 = time.ticks_ms()
+    data = await scanner.read_zone_async(0, expect_len)
+    dt = time.ticks_diff(time.ticks_ms(), t0)
+    check("lost ACK, read LEN %d" % expect_len,
+          data == bytes(dev.zones[0:expect_len]) and dt < GM805.ACK_TIMEOUT_MS // 2,
+          "(%r, %d ms)" % (data, dt))
+
+
+async def zone_nak():
+    """NAK 받은 쓰기는 사본에 반영하지 않고 staged 로 남겨 다음 commit 에서 다시 씀"""
+    scanner = GM805(uart_id=0, tx=12, rx=13)
+    dev = GM805Device(scanner.uart)
+    await scanner.zones.load_async(0, 4)
+    dev.nak_writes = True
+    scanner.zones.set(1, 0x33)
+    n1 = await scanner.zones.commit_async()
+    kept = scanner.zones.get(1) == 0x33 and scanner.zones._val[1] == 0 and dev.zones[1] == 0
+    dev.nak_writes = False
+    n2 = scanner.zones.commit()
+    check("zone write NAK", n1 == 0 and kept and n2 == 1 and dev.zones[1] == 0x33
+          and not scanner.zones._staged, "(%d, %s, %d)" % (n1, kept, n2))
+
+
+def stats_notify():
+    """MTU 교환 전(23) 연결에는 20 B 에 들어가는 짧은 요약, 교환한 연결에는 전체 요약"""
+    r = BLEQRReceiver()
+    ble = r._ble
+    ble.connect(1)
+    ble.connect(2)
+    r._irq(21, (2, 23))                 # 연결 2: 기본 MTU
+    tracing.reset()
+    tracing.add(tracing.ST_TOTAL, 1500)
+    full = tracing.summary()
+    r.publish_stats(full)
+    sent = {h: v for h, _, v in ble.notified[-2:]}
+    check("stats notify by MTU", sent.get(1) == full and sent.get(2) == tracing.summary_short()
+          and len(sent.get(2, b"")) <= 20 and ble.gatts_read(r._stats_handle) == full,
+          "(%d B, %d B)" % (len(sent.get(1, b"")), len(sent.get(2, b""))))
+
+
+# ---- 레코드 코덱 ----
+def record_codec():
+    """이전 구현(decode().strip().split('-'), route 앞 2글자)과 같은 결과인지"""
+    for raw in ("123456-홍길동-SC\r\n", "  123456-Kim-SC  ", "\t77-이순신-수술실\n",
+                "88-Lee-외래-extra", "99-Park-A가나"):
+        old = raw.strip().split("-")
+        want = (old[0], old[1], old[2][0:2])
+        rec = parse(raw.encode())
+        got = rec.fields() if rec is not None else None
+        check("record %r" % raw, got == want, "(%r)" % (got,))
+
+
+# ---- BLE 수신 ----
+async def oversize_record():
+    """슬롯보다 긴 묶음 레코드는 잘라서 전달하지 않고 frame error 로 세며 ACK 하지 않음"""
+    r = BLEQRReceiver()
+    ble = r._ble
+    ble.connect(1)
+    big = b"9" * (SLOT_SIZE + 77)
+    ok = b"123456-Kim-SC"
+    ble.write(1, r._bulk_handle, bytes((len(big),)) + big + bytes((len(ok),)) + ok)
+    got = await asyncio.wait_for_ms(r.get_bytes(), 100)
+    await asyncio.sleep_ms(10)
+    c = r._conns[0]
+    check("oversize bulk record", got == ok and c.frame_errors == 1 and c.rx_seq == 1
+          and ble.gatts_read(r._ack_handle) == b"\x01\x00",
+          "(%r, errors %d, seq %d)" % (got, c.frame_errors, c.rx_seq))
+
+
+def main():
+    asyncio.run(lost_ack(1))
+    asyncio.run(lost_ack(2))
+    asyncio.run(zone_nak())
+    asyncio.run(oversize_record())
+    stats_notify()
+    record_codec()
+    if failed:
+        print("%d failed" % len(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# gm805_device.py
+# GM805 스캐너 에뮬레이터: UART 대역에 붙어 존 읽기/쓰기/저장 명령에 응답하고,
+# 모드(수동/커맨드/연속/감지)에 맞게 바코드를 내보냄. CRC 는 펌웨어와 독립된 비트 단위 구현.
+MODE_MANUAL     = 0
+MODE_COMMAND    = 1
+MODE_CONTINUOUS = 2
+MODE_INDUCTION  = 3
+
+_TYPE_READ  = 0x07
+_TYPE_WRITE = 0x08
+_TYPE_SAVE  = 0x09
+
+
+def crc_ccitt(data, crc=0):
+    for b in data:
+        crc ^= b << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+            crc &= 0xFFFF
+    return crc
+
+
+class GM805Device:
+    def __init__(self, uart, zone_size=0x100):
+        self.uart = uart
+        uart.device = self
+        self.zones = bytearray(zone_size)
+        self.flash = bytes(self.zones)
+        self._buf = bytearray()
+        self._queued = []       # 커맨드 모드: 트리거를 기다리는 바코드
+        # 통계
+        self.commands = 0
+        self.bad_crc = 0
+        self.triggers = 0
+        self.saves = 0
+        self.nak_writes = False  # True 면 존 쓰기를 거부(NAK, TYPE!=00)하고 값을 바꾸지 않음
+
+    @property
+    def mode(self):
+        return self.zones[0x00] & 0x03
+
+    # ---- Pico -> 장치 ----
+    def write(self, data):
+        self._buf += data
+        while True:
+            i = self._buf.find(b"\x7e\x00")
+            if i < 0:
+                self._buf = self._buf[-1:] if self._buf[-1:] == b"\x7e" else bytearray()
+                return
+            if i:
+                del self._buf[:i]
+            if len(self._buf) < 4:
+                return
+            end = 6 + self._buf[3] + 2
+            if len(self._buf) < end:
+                return
+            frame = bytes(self._buf[:end])
+            del self._buf[:end]
+            self._command(frame)
+
+    def _command(self, frame):
+        self.commands += 1
+        body = frame[2:-2]
+        if frame[-2:] != b"\xab\xcd" and crc_ccitt(body) != (frame[-2] << 8) | frame[-1]:
+            self.bad_crc += 1
+            return              # 실제 장치처럼 응답 없음
+        typ, ln = body[0], body[1]
+        addr = (body[2] << 8) | body[3]
+        data = body[4:4 + ln]
+        if typ == _TYPE_READ:
+            count = data[0] or 256
+            self._reply(bytes(self.zones[addr:addr + count]))
+        elif typ == _TYPE_WRITE:
+            if self.nak_writes:
+                self._reply(b"\x00", status=0x01)
+                return
+            self.zones[addr:addr + ln] = data
+            self._reply(b"\x00")
+            if addr <= 0x02 < addr + ln and self.zones[0x02] & 0x01:
+                self.zones[0x02] &= 0xFE    # 트리거 비트는 스캔 후 자동 해제
+                self.triggers += 1
+                if self.mode == MODE_COMMAND and self._queued:
+                    self._emit(self._queued.pop(0))
+        elif typ == _TYPE_SAVE:
+            self.flash = bytes(self.zones)
+            self.saves += 1
+            self._reply(b"\x00")
+
+    def _reply(self, data, status=0x00):
+        body = bytes((status, len(data) & 0xFF)) + data
+        crc = crc_ccitt(body)
+        self.uart.feed(b"\x02\x00" + body + bytes((crc >> 8, crc & 0xFF)))
+
+    def _emit(self, code):
+        if isinstance(code, str):
+            code = code.encode()
+        self.uart.feed(code + b"\r\n")
+
+    # ---- 테스트용: 스캔 창 앞에 바코드를 댄 것 ----
+    def scan(self, code):
+        """연속/감지 모드면 바로 전송, 커맨드 모드면 다음 트리거 때 전송"""
+        if self.mode == MODE_COMMAND:
+            self._queued.append(code)
+        else:
+            self._emit(code)
@@ -0,0 +1,51 @@
+# host.py
+# 호스트(CPython 또는 MicroPython unix 포트)에서 펌웨어 모듈을 import 할 수 있게 준비합니다.
+#   sys.path.insert(0, "tools/sim"); import host; host.install()
+# 실제 모듈이 있고 필요한 API 를 갖췄으면 그대로 쓰고, 없을 때만 sim_* 대역을 sys.modules 에 등록.
+# rp2 는 등록하지 않음 -> display.py 는 DMA 없이 청크 전송 경로를 씀.
+import sys
+import time
+
+_DIR = __file__.rsplit("/", 1)[0] if "/" in __file__ else "."
+FIRMWARE_DIR = _DIR + "/../.."
+CPYTHON = sys.implementation.name != "micropython"
+
+
+def _usable(name, attr):
+    try:
+        mod = __import__(name)
+    except ImportError:
+        return False
+    return attr is None or hasattr(mod, attr)
+
+
+def _install_time():
+    if hasattr(time, "ticks_us"):
+        return
+    t0 = time.perf_counter_ns()
+    time.ticks_ms = lambda: (time.perf_counter_ns() - t0) // 1_000_000
+    time.ticks_us = lambda: (time.perf_counter_ns() - t0) // 1_000
+    time.ticks_cpu = time.ticks_us
+    time.ticks_diff = lambda a, b: a - b
+    time.ticks_add = lambda a, b: a + b
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1_000_000)
+
+
+def install():
+    if _DIR not in sys.path:
+        sys.path.insert(0, _DIR)
+    if FIRMWARE_DIR not in sys.path:
+        sys.path.insert(1, FIRMWARE_DIR)
+    _install_time()
+    for name, attr in (("micropython", "const"), ("uasyncio", "ThreadSafeFlag"),
+                       ("framebuf", "FrameBuffer"), ("machine", "SPI"), ("bluetooth", "BLE")):
+        if not _usable(name, attr):
+            sys.modules[name] = __import__("sim_" + name)
+    if CPYTHON:
+        # MicroPython 컴파일러가 처리하는 이름들 (const, viper 타입 주석)
+        import builtins
+        import micropython
+        builtins.const = micropython.const
+        for n in ("ptr8", "ptr16", "ptr32", "uint"):
+            setattr(builtins, n, lambda x: x)
@@ -0,0 +1,108 @@
+# sim_bluetooth.py
+# bluetooth 모듈 대역: GATT 서버 값 저장 + 테스트용으로 central 연결/Write 를 IRQ 로 주입
+FLAG_READ              = 0x0002
+FLAG_WRITE_NO_RESPONSE = 0x0004
+FLAG_WRITE             = 0x0008
+FLAG_NOTIFY            = 0x0010
+FLAG_INDICATE          = 0x0020
+
+_IRQ_CENTRAL_CONNECT    = 1
+_IRQ_CENTRAL_DISCONNECT = 2
+_IRQ_GATTS_WRITE        = 3
+_IRQ_MTU_EXCHANGED      = 21
+
+
+class UUID:
+    def __init__(self, value):
+        if isinstance(value, int):
+            self._b = value.to_bytes(2, "little")
+        else:
+            h = value.replace("-", "")
+            self._b = bytes(int(h[i:i + 2], 16) for i in range(len(h) - 2, -2, -2))
+
+    def __bytes__(self):
+        return self._b
+
+    def __eq__(self, other):
+        return isinstance(other, UUID) and self._b == other._b
+
+    def __hash__(self):
+        return hash(self._b)
+
+
+class BLE:
+    def __init__(self):
+        self._active = False
+        self._irq = None
+        self._cfg = {"mtu": 23, "gap_name": b"MPY", "mac": (0, b"\x00\x00SIM\x00")}
+        self._values = {}
+        self._next_handle = 1
+        self.adv_count = 0
+        self.notified = []        # (conn, handle, data)
+        self.connected = set()
+
+    def active(self, a=None):
+        if a is not None:
+            self._active = bool(a)
+        return self._active
+
+    def config(self, *args, **kwargs):
+        self._cfg.update(kwargs)
+        if args:
+            return self._cfg.get(args[0])
+
+    def irq(self, handler):
+        self._irq = handler
+
+    def gap_advertise(self, interval_us, adv_data=None, resp_data=None, connectable=True):
+        self.adv_count += 1
+
+    def gap_disconnect(self, conn_handle):
+        if conn_handle in self.connected:
+            self.disconnect(conn_handle)
+            return True
+        return False
+
+    def gatts_register_services(self, services):
+        out = []
+        for _uuid, chars in services:
+            handles = []
+            for ch in chars:
+                self._next_handle += 1          # 선언 핸들
+                handles.append(self._next_handle)
+                self._values[self._next_handle] = b""
+                self._next_handle += 1
+            out.append(tuple(handles))
+        return tuple(out)
+
+    def gatts_set_buffer(self, handle, n, append=False):
+        pass
+
+    def gatts_read(self, handle):
+        v = self._values[handle]
+        self._values[handle] = b""
+        return v
+
+    def gatts_write(self, handle, data, send_update=False):
+        self._values[handle] = bytes(data)
+
+    def gatts_notify(self, conn_handle, handle, data=None):
+        self.notified.append((conn_handle, handle, bytes(self._values[handle] if data is None else data)))
+
+    def gattc_exchange_mtu(self, conn_handle):
+        if self._irq:
+            self._irq(_IRQ_MTU_EXCHANGED, (conn_handle, self._cfg["mtu"]))
+
+    # ---- 테스트용 주입 ----
+    def connect(self, conn_handle, addr_type=0, addr=b"\x00" * 6):
+        self.connected.add(conn_handle)
+        self._irq(_IRQ_CENTRAL_CONNECT, (conn_handle, addr_type, addr))
+
+    def disconnect(self, conn_handle):
+        self.connected.discard(conn_handle)
+        self._irq(_IRQ_CENTRAL_DISCONNECT, (conn_handle, 0, b"\x00" * 6))
+
+    def write(self, conn_handle, handle, data):
+        """central 이 characteristic 에 Write 한 것처럼 값 저장 후 IRQ 호출"""
+        self._values[handle] = bytes(data)
+        self._irq(_IRQ_GATTS_WRITE, (conn_handle, handle))
@@ -0,0 +1,85 @@
+# sim_framebuf.py
+# CPython 용 framebuf 대역 (RGB565 만). 픽셀 저장 형식은 실제와 같은 리틀엔디안이라
+# 버퍼 바이트를 장치 결과와 비교할 수 있음. text() 는 8x8 의사 폰트 (모양만 다름, 크기/위치는 동일)
+MONO_VLSB = 0
+RGB565    = 1
+GS4_HMSB  = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB  = 5
+GS8       = 6
+
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, fmt, stride=None):
+        if fmt != RGB565:
+            raise ValueError("sim framebuf: RGB565 only")
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.stride = stride or width
+
+    def _set(self, x, y, c):
+        i = (y * self.stride + x) * 2
+        self.buf[i] = c & 0xFF
+        self.buf[i + 1] = (c >> 8) & 0xFF
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if c is None:
+            i = (y * self.stride + x) * 2
+            return self.buf[i] | (self.buf[i + 1] << 8)
+        self._set(x, y, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        row = bytes((c & 0xFF, (c >> 8) & 0xFF)) * (x1 - x0)
+        for yy in range(y0, y1):
+            i = (yy * self.stride + x0) * 2
+            self.buf[i:i + len(row)] = row
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.width, self.height, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            return self.fill_rect(x, y, w, h, c)
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def text(self, s, x, y, c=1):
+        for ch in s:
+            o = ord(ch)
+            for r in range(8):
+                bits = 0 if ch == " " else ((o * 37 + r * 91) ^ (o << r)) & 0x7E
+                for b in range(8):
+                    if bits & (0x80 >> b):
+                        self.pixel(x + b, y + r, c)
+            x += 8
+
+    def blit(self, fb, x, y, key=-1, palette=None):
+        for yy in range(fb.height):
+            ty = y + yy
+            if not 0 <= ty < self.height:
+                continue
+            for xx in range(fb.width):
+                tx = x + xx
+                if not 0 <= tx < self.width:
+                    continue
+                c = fb.pixel(xx, yy)
+                if c != key:
+                    self._set(tx, ty, c)
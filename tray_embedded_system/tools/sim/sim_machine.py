@@ -0,0 +1,189 @@
+# sim_machine.py
+# machine 모듈 대역: Pin/PWM 은 값만 보관, SPI 는 바이트를 세고 보레이트로 전송 시간을 모델링,
+# UART 는 송수신 버퍼 + 장치 에뮬레이터(gm805_device.GM805Device) 연결 지점
+try:
+    from io import IOBase   # MicroPython unix 포트: ioctl 이 있어야 asyncio 가 poll 가능
+except ImportError:
+    IOBase = object
+
+_STREAM_POLL = 3
+_POLLIN      = 1
+_POLLOUT     = 4
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=IN, pull=None, value=None):
+        self.id = id
+        self.mode = mode
+        self._v = 0 if value is None else value
+
+    def __call__(self, v=None):
+        if v is None:
+            return self._v
+        self._v = 1 if v else 0
+
+    def value(self, v=None):
+        return self(v)
+
+    def on(self):
+        self._v = 1
+
+    def off(self):
+        self._v = 0
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def irq(self, *args, **kwargs):
+        pass
+
+
+class PWM:
+    def __init__(self, pin, freq=1000, duty_u16=0):
+        self.pin = pin
+        self._freq = freq
+        self._duty = duty_u16
+
+    def freq(self, f=None):
+        if f is None:
+            return self._freq
+        self._freq = f
+
+    def duty_u16(self, d=None):
+        if d is None:
+            return self._duty
+        self._duty = d
+
+    def deinit(self):
+        pass
+
+
+class SPI:
+    """쓰기만 받는 SPI 싱크. 실제 전송 대신 바이트 수와 선로 시간(wire_us)을 누적"""
+    WRITE_OVERHEAD_US = 2   # write() 호출당 고정 비용 (CS/FIFO 준비 등, 대략치)
+
+    def __init__(self, id=0, baudrate=1_000_000, polarity=0, phase=0, bits=8, firstbit=0,
+                 sck=None, mosi=None, miso=None):
+        self.id = id
+        self.baudrate = baudrate
+        self.log = None         # list 로 바꾸면 write 된 바이트를 전부 기록
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.nbytes = 0
+        self.nwrites = 0
+        self.wire_us = 0
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate:
+            self.baudrate = baudrate
+
+    def write(self, buf):
+        n = len(buf)
+        self.nbytes += n
+        self.nwrites += 1
+        self.wire_us += n * 8 * 1_000_000 // self.baudrate + self.WRITE_OVERHEAD_US
+        if self.log is not None:
+            self.log.append(bytes(buf))
+
+    def deinit(self):
+        pass
+
+
+class UART(IOBase):
+    """송신은 tx 에 쌓고(연결된 장치가 있으면 전달), 수신은 feed() 로 넣은 바이트를 읽음"""
+    def __init__(self, id=0, baudrate=9600, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.rx = bytearray()
+        self.tx = bytearray()
+        self.device = None      # write(data) 를 받는 장치 에뮬레이터
+        self.on_rx = None       # feed() 때 호출 (sim StreamReader 가 대기에서 깨어남)
+        self.tx_wire_us = 0
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate:
+            self.baudrate = baudrate
+
+    def feed(self, data):
+        """장치 -> Pico 방향 바이트 도착"""
+        self.rx += data
+        if self.on_rx is not None:
+            self.on_rx()
+
+    def any(self):
+        return len(self.rx)
+
+    def read(self, n=None):
+        if not self.rx:
+            return None
+        n = len(self.rx) if n is None else min(n, len(self.rx))
+        d = bytes(self.rx[:n])
+        del self.rx[:n]
+        return d
+
+    def readinto(self, buf, n=None):
+        n = min(len(buf) if n is None else n, len(self.rx))
+        if not n:
+            return None
+        buf[:n] = self.rx[:n]
+        del self.rx[:n]
+        return n
+
+    def readline(self):
+        i = self.rx.find(b"\n")
+        return self.read(None if i < 0 else i + 1)
+
+    def write(self, buf):
+        data = bytes(buf)
+        self.tx += data
+        self.tx_wire_us += len(data) * 10 * 1_000_000 // self.baudrate   # 8N1 = 10 비트/바이트
+        if self.device is not None:
+            self.device.write(data)
+        return len(data)
+
+    def ioctl(self, req, arg):
+        if req == _STREAM_POLL:
+            return (arg & _POLLIN if self.rx else 0) | (arg & _POLLOUT)
+        return 0
+
+    def deinit(self):
+        pass
+
+
+class _Mem:
+    """mem32 대역: 레지스터 쓰기를 dict 에 보관"""
+    def __init__(self):
+        self.regs = {}
+
+    def __getitem__(self, addr):
+        return self.regs.get(addr, 0)
+
+    def __setitem__(self, addr, v):
+        self.regs[addr] = v & 0xFFFFFFFF
+
+
+mem32 = _Mem()
+
+
+def freq(hz=None):
+    return 125_000_000
+
+
+def idle():
+    pass
+
+
+def unique_id():
+    return b"\x00SIMPICO"
+
+
+def reset():
+    raise SystemExit("machine.reset()")
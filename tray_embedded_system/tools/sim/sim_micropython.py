@@ -0,0 +1,31 @@
+# sim_micropython.py
+# CPython 용 micropython 모듈 대역. 데코레이터는 그대로 통과 (viper/native 코드는 일반 파이썬으로 실행)
+
+
+def const(x):
+    return x
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def schedule(f, arg):
+    # 실제 장치처럼 IRQ 문맥 밖(다음 틈)에서 실행: 이벤트 루프가 있으면 call_soon, 없으면 바로
+    try:
+        import asyncio
+        asyncio.get_running_loop().call_soon(f, arg)
+    except RuntimeError:
+        f(arg)
+
+
+def alloc_emergency_exception_buf(n):
+    pass
+
+
+def mem_info(*args):
+    pass
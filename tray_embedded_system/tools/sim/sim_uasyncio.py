@@ -0,0 +1,76 @@
+# sim_uasyncio.py
+# CPython asyncio 위에 uasyncio 전용 API(sleep_ms, wait_for_ms, ThreadSafeFlag, StreamReader)를 얹은 대역
+from asyncio import *
+import asyncio as _a
+
+
+async def sleep_ms(ms):
+    await _a.sleep(ms / 1000)
+
+
+def wait_for_ms(aw, ms):
+    return _a.wait_for(aw, ms / 1000)
+
+
+class ThreadSafeFlag:
+    """set()이 대기자 없이 와도 한 번은 기억하는(latched) 플래그"""
+    def __init__(self):
+        self._ev = None
+        self._state = False
+
+    def set(self):
+        self._state = True
+        if self._ev is not None:
+            self._ev.set()
+
+    def clear(self):
+        self._state = False
+
+    async def wait(self):
+        if self._ev is None:
+            self._ev = _a.Event()
+        while not self._state:
+            self._ev.clear()
+            await self._ev.wait()
+        self._state = False
+
+
+class StreamReader:
+    """machine.UART 대역용 StreamReader. 스트림에 on_rx 훅이 있으면 도착 즉시 깨어나고,
+    없으면 1ms 간격으로 폴링"""
+    def __init__(self, s, *args):
+        self.s = s
+        self._ev = None
+        if hasattr(s, "on_rx"):
+            self._ev = _a.Event()
+            s.on_rx = self._ev.set
+
+    async def _idle(self):
+        if self._ev is None:
+            await _a.sleep(0.001)
+        else:
+            await self._ev.wait()
+            self._ev.clear()
+
+    async def readinto(self, buf):
+        while True:
+            n = self.s.readinto(buf)
+            if n:
+                return n
+            await self._idle()
+
+    async def read(self, n=-1):
+        while True:
+            d = self.s.read(n if n > 0 else None)
+            if d:
+                return d
+            await self._idle()
+
+    def write(self, buf):
+        self.s.write(buf)
+
+    async def drain(self):
+        pass
+
+
+StreamWriter = StreamReader
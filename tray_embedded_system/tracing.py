@@ -0,0 +1,111 @@
+# tracing.py
+# QR 도착 -> 패널 전송 완료까지 단계별 지연(ticks_us)을 고정 메모리 log2 히스토그램에 모읍니다.
+# 기록은 add()/span() 한 줄, 요약은 summary()(BLE 용 바이너리) 또는 report()(문자열).
+import struct
+import time
+import micropython
+from micropython import const
+import uasyncio as asyncio
+from array import array
+
+# 단계 (히스토그램 인덱스)
+ST_BLE    = 0   # BLE Write IRQ -> inbox 에서 꺼냄
+ST_UART   = 1   # 스캐너 첫 바이트 도착 -> 바코드 꺼냄
+ST_PARSE  = 2   # 레코드 파싱
+ST_QUEUE  = 3   # post() -> 렌더 태스크가 집어 듦
+ST_RENDER = 4   # 프레임버퍼 그리기 (banded 모드는 전송 포함)
+ST_FLUSH  = 5   # SPI 전송 완료까지
+ST_TOTAL  = 6   # 도착(IRQ/첫 바이트) -> 패널 전송 완료
+STAGES = ("ble", "uart", "parse", "queue", "render", "flush", "total")
+
+NBUCKETS = const(24)     # 버킷 b: [2^(b-1), 2^b) us, 마지막 버킷은 그 이상 전부 (~8 s)
+SUMMARY_VERSION = 1
+_SUMMARY_HDR = "<BB"       # version, 단계 수
+_SUMMARY_ROW = "<IIII"     # count, p50, p99, max (us)
+_SHORT = "<BBIIII"         # version, 단계 번호, count, p50, p99, max = 18 B (기본 MTU 23 의 Notify 20 B 에 들어감)
+
+_n = len(STAGES)
+_hist = array("L", [0] * (_n * NBUCKETS))
+_count = array("L", [0] * _n)
+_sum = array("L", [0] * _n)    # 평균용 (넘치면 0으로 다시 시작)
+_max = array("L", [0] * _n)
+
+
+@micropython.viper
+def _bucket(us: int) -> int:
+    b = 0
+    while us > 0 and b < NBUCKETS - 1:
+        us >>= 1
+        b += 1
+    return b
+
+
+def add(stage, us):
+    """단계 stage 에 us 하나 기록 (할당 없음)"""
+    if us < 0:
+        us = 0
+    _hist[stage * NBUCKETS + _bucket(us)] += 1
+    _count[stage] += 1
+    s = _sum[stage] + us
+    _sum[stage] = s if s < 0xFFFFFFFF else 0
+    if us > _max[stage]:
+        _max[stage] = us
+
+
+def span(stage, t0):
+    """t0(ticks_us) 부터 지금까지를 기록하고 지금 시각 반환 (다음 구간의 시작점)"""
+    now = time.ticks_us()
+    add(stage, time.ticks_diff(now, t0))
+    return now
+
+
+def reset():
+    for i in range(len(_hist)):
+        _hist[i] = 0
+    for i in range(_n):
+        _count[i] = _sum[i] = _max[i] = 0
+
+
+def percentile(stage, p):
+    """p(0~100) 백분위가 들어 있는 버킷의 상한 (us, max 로 잘림)"""
+    n = _count[stage]
+    if not n:
+        return 0
+    want = (n * p + 99) // 100
+    acc = 0
+    o = stage * NBUCKETS
+    for b in range(NBUCKETS):
+        acc += _hist[o + b]
+        if acc >= want:
+            return min((1 << b) - 1 if b else 0, _max[stage])
+    return _max[stage]
+
+
+def summary():
+    """BLE 로 내보낼 요약: 헤더 + 단계별 (count, p50, p99, max)"""
+    out = struct.pack(_SUMMARY_HDR, SUMMARY_VERSION, _n)
+    for s in range(_n):
+        out += struct.pack(_SUMMARY_ROW, _count[s], percentile(s, 50), percentile(s, 99), _max[s])
+    return out
+
+
+def summary_short(stage=ST_TOTAL):
+    """한 단계만의 요약 (18 B). MTU 교환 전 연결에 Notify 할 때 사용 (길이로 summary() 와 구분)"""
+    return struct.pack(_SHORT, SUMMARY_VERSION, stage, _count[stage],
+                       percentile(stage, 50), percentile(stage, 99), _max[stage])
+
+
+def report():
+    lines = ["%-7s %7s %8s %8s %8s %8s" % ("stage", "n", "mean", "p50", "p99", "max")]
+    for s in range(_n):
+        n = _count[s]
+        lines.append("%-7s %7d %8d %8d %8d %8d" % (
+            STAGES[s], n, _sum[s] // n if n else 0, percentile(s, 50), percentile(s, 99), _max[s]))
+    return "\n".join(lines)
+
+
+async def run(sink, period_ms=5000):
+    """주기적으로 summary() 를 sink 에 넘기는 태스크 (예: BLEQRReceiver.publish_stats)"""
+    while True:
+        await asyncio.sleep_ms(period_ms)
+        sink(summary())